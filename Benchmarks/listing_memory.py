@@ -0,0 +1,91 @@
+"""
+Memory footprint of retained eBay listings: raw Browse API summaries vs
+compact Listing records.
+
+    python Benchmarks/listing_memory.py [--count 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.listing import parse_listing
+
+
+def fake_summary(i):
+    """
+    An item summary shaped like a real Browse API search result.
+    """
+    item_id = f"v1|{110000000000 + i}|0"
+    return {
+        "itemId": item_id,
+        "title": f"2023 Pokemon Scarlet Violet 151 Charizard ex #{i % 200:03d} PSA {i % 10 + 1} Gem Mint",
+        "leafCategoryIds": ["183454"],
+        "categories": [
+            {"categoryId": "183454", "categoryName": "CCG Individual Cards"},
+            {"categoryId": "2536", "categoryName": "Collectible Card Games"},
+        ],
+        "image": {"imageUrl": f"https://i.ebayimg.com/images/g/{i:08x}/s-l225.jpg"},
+        "thumbnailImages": [{"imageUrl": f"https://i.ebayimg.com/images/g/{i:08x}/s-l1600.jpg"}],
+        "additionalImages": [{"imageUrl": f"https://i.ebayimg.com/images/g/{i:08x}{n}/s-l225.jpg"} for n in range(3)],
+        "currentBidPrice": {"value": f"{10 + i % 500}.{i % 100:02d}", "currency": "USD"},
+        "bidCount": i % 30,
+        "itemHref": f"https://api.ebay.com/buy/browse/v1/item/{item_id}",
+        "seller": {"username": f"seller_{i % 5000}", "feedbackPercentage": "99.8", "feedbackScore": 1200 + i % 900},
+        "condition": "Graded",
+        "conditionId": "2750",
+        "shippingOptions": [
+            {"shippingCostType": "FIXED", "shippingCost": {"value": f"{4 + i % 3}.99", "currency": "USD"}},
+            {"shippingCostType": "CALCULATED", "shippingCost": {"value": "12.50", "currency": "USD"},
+             "importCharge": {"value": "1.25", "currency": "USD"}},
+        ],
+        "buyingOptions": ["AUCTION"],
+        "itemEndDate": "2026-10-25T18:30:00.000Z",
+        "itemWebUrl": f"https://www.ebay.com/itm/{110000000000 + i}",
+        "itemLocation": {"postalCode": "940**", "country": "US"},
+        "adultOnly": False,
+        "legacyItemId": str(110000000000 + i),
+        "availableCoupons": False,
+        "itemCreationDate": "2026-10-18T18:30:00.000Z",
+        "topRatedBuyingExperience": False,
+        "priorityListing": False,
+        "listingMarketplaceId": "EBAY_US",
+        "epid": str(26053840000 + i % 200),
+    }
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    kept = build(count)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    gc.collect()
+    return current, peak
+
+
+def keep_raw(count):
+    return [fake_summary(i) for i in range(count)]
+
+
+def keep_listings(count):
+    # Each summary is parsed as it "arrives" and dropped straight away
+    return [parse_listing(fake_summary(i)) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000, help="listings to keep (default 100000)")
+    args = parser.parse_args()
+
+    print(f"{'kind':<12}{'retained MB':>14}{'peak MB':>10}{'bytes/listing':>16}")
+    for name, build in (("raw JSON", keep_raw), ("Listing", keep_listings)):
+        current, peak = measure(build, args.count)
+        print(f"{name:<12}{current / 1e6:>14.1f}{peak / 1e6:>10.1f}{current / args.count:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""
+End-to-end benchmark of the search -> product URL -> price pipeline against
+local stand-ins for eBay, SerpAPI and PriceCharting.
+
+    python Benchmarks/pipeline_benchmark.py --listings 200,1000 --concurrency 4,16
+
+The stub server replays the recorded responses in Benchmarks/fixtures with
+configurable latency, error and throttle rates; no API keys or network access needed.
+"""
+import argparse
+import contextlib
+import copy
+import json
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+UPSTREAMS = ("ebay", "serpapi", "pricecharting")
+DEFAULT_LATENCY_MS = "ebay=120,serpapi=400,pricecharting=150"
+# Every n-th stub card is served the high-value product page
+HIGH_VALUE_EVERY = 2
+# Card number in the titles the stub generates ("BENCH0X00012 ..."), as it ends up in product URL slugs
+PRODUCT_NUMBER_RE = re.compile(r"x(\d{5})")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def parse_upstream_values(text, cast=float):
+    """
+    "ebay=120,serpapi=400" -> {"ebay": 120.0, "serpapi": 400.0}; a bare
+    number applies to every upstream.
+    """
+    if "=" not in text:
+        return {name: cast(text) for name in UPSTREAMS}
+    values = {name: cast(0) for name in UPSTREAMS}
+    for part in text.split(","):
+        name, value = part.split("=")
+        values[name.strip()] = cast(value)
+    return values
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Hundreds of lookups connect at once; the default backlog of 5 drops them
+    request_queue_size = 256
+
+
+class StubUpstreams:
+    """
+    One local HTTP server standing in for all three upstreams:
+      /buy/browse/v1/item_summary/search   Browse API pages built from the recorded summaries
+      /search.json                         SerpAPI organic_results pointing back at this server
+      /www.pricecharting.com/product/...   a recorded PriceCharting product page
+
+    A search for "<tag> <count>" returns <count> listings whose titles start
+    with <tag>, so every run can use fresh (uncached) titles. `products` is
+    how many distinct cards the listings are spread over. Every
+    HIGH_VALUE_EVERY-th card gets the high-value page (prices of $1,000 and
+    up), and `expected_price(url)` is the price a scrape of `url` must find.
+    """
+
+    def __init__(self, latency_ms, error_rate, products, throttle_rate=None, seed=7):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate or {name: 0.0 for name in UPSTREAMS}
+        self.products = products
+        self.page = json.loads(load_fixture("browse_search_page.json"))
+        self.organic = json.loads(load_fixture("serpapi_organic.json"))
+        self.product_pages = {
+            False: (load_fixture("pricecharting_product.html").encode("utf-8"), "$118.42"),
+            True: (load_fixture("pricecharting_product_high.html").encode("utf-8"), "$1,234.56"),
+        }
+        self.requests = {name: 0 for name in UPSTREAMS}
+        self.errors = {name: 0 for name in UPSTREAMS}
+        self.throttled = {name: 0 for name in UPSTREAMS}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = _StubServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _delay_and_fail(self, upstream):
+        """
+        Sleeps for the upstream's latency and returns the status to fail with
+        (429 for a throttle, 500 for an error), or None.
+        """
+        with self._lock:
+            self.requests[upstream] += 1
+            mean = self.latency_ms[upstream] / 1000
+            delay = self._random.uniform(0.5 * mean, 1.5 * mean)
+            roll = self._random.random()
+            status = None
+            if roll < self.throttle_rate[upstream]:
+                self.throttled[upstream] += 1
+                status = 429
+            elif roll < self.throttle_rate[upstream] + self.error_rate[upstream]:
+                self.errors[upstream] += 1
+                status = 500
+        time.sleep(delay)
+        return status
+
+    def browse_page(self, query, offset, limit):
+        tag, _, count = query.rpartition(" ")
+        total = int(count) if count.isdigit() else 50
+        summaries = self.page["itemSummaries"]
+        items = []
+        now = datetime.now(timezone.utc)
+        for n in range(offset, min(offset + limit, total)):
+            item = copy.deepcopy(summaries[n % len(summaries)])
+            legacy_id = str(300000000000 + n)
+            item["itemId"] = f"v1|{legacy_id}|0"
+            item["legacyItemId"] = legacy_id
+            item["itemWebUrl"] = f"https://www.ebay.com/itm/{legacy_id}"
+            item["title"] = f"{tag}X{n % self.products:05d} {item['title']}"
+            # Recorded end dates are in the past by now; keep every auction live
+            ends = now + timedelta(hours=1 + n % 168)
+            item["itemEndDate"] = ends.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            items.append(item)
+        page = {"total": total, "offset": offset, "limit": limit, "itemSummaries": items}
+        if offset + limit < total:
+            page["next"] = f"{self.base_url}/buy/browse/v1/item_summary/search?offset={offset + limit}"
+        return page
+
+    def serpapi_result(self, query):
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+        result = copy.deepcopy(self.organic)
+        result["search_parameters"]["q"] = query
+        for organic in result["organic_results"]:
+            path = urlparse(organic["link"]).path
+            organic["link"] = f"{self.base_url}/www.pricecharting.com{path}-{slug}"
+        return result
+
+    def _product_page(self, url):
+        match = PRODUCT_NUMBER_RE.search(url)
+        return self.product_pages[bool(match) and int(match.group(1)) % HIGH_VALUE_EVERY == 0]
+
+    def expected_price(self, url):
+        return self._product_page(url)[1]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real upstreams
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                qs = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path.startswith("/buy/browse/"):
+                    upstream = "ebay"
+                elif url.path == "/search.json":
+                    upstream = "serpapi"
+                else:
+                    upstream = "pricecharting"
+                status = stub._delay_and_fail(upstream)
+                if status:
+                    self._send(status, b"stub upstream error", "text/plain")
+                    return
+                if upstream == "ebay":
+                    page = stub.browse_page(qs.get("q", ""), int(qs.get("offset", 0)), int(qs.get("limit", 50)))
+                    self._send(200, json.dumps(page).encode("utf-8"), "application/json")
+                elif upstream == "serpapi":
+                    result = stub.serpapi_result(qs.get("q", ""))
+                    self._send(200, json.dumps(result).encode("utf-8"), "application/json")
+                else:
+                    self._send(200, stub._product_page(url.path)[0], "text/html; charset=utf-8")
+
+        return Handler
+
+
+class StageTimer:
+    """
+    Wraps a stage function and records how long every call takes.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.durations = []
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        start = time.perf_counter()
+        try:
+            return self.fn(*args)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self.durations.append(time.perf_counter() - start)
+
+
+def run_case(modules, stub, run_tag, listings, concurrency, trace_memory, verbose):
+    config, ebay_search, pricecharting, limiter_stats = modules
+    config.MAX_RESULTS = listings
+    engine = pricecharting.create_engine(limits={"serpapi": concurrency, "pricecharting": concurrency})
+
+    page_timer = StageTimer(ebay_search.fetch_search_page)
+    ebay_search.fetch_search_page = page_timer
+    provider = engine.providers[0]
+    provider.resolve_url = resolve_timer = StageTimer(provider.resolve_url)
+    provider.fetch_price = price_timer = StageTimer(provider.fetch_price)
+
+    arrived = {}
+    end_to_end = []
+
+    def on_listing(item):
+        arrived[item.item_id] = time.perf_counter()
+
+    def on_result(result):
+        end_to_end.append(time.perf_counter() - arrived[result.item.item_id])
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        # The scrapers' progress prints would drown the report
+        with open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+            results = engine.run(("keyword", f"{run_tag} {listings}", "Auction"), on_result, on_listing)
+    finally:
+        elapsed = time.perf_counter() - start
+        ebay_search.fetch_search_page = page_timer.fn
+        engine.shutdown()
+    peak_mb = None
+    if trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    stages = {
+        "ebay_page": (page_timer.durations, page_timer.failures),
+        "resolve_url": (resolve_timer.durations, resolve_timer.failures),
+        "fetch_price": (price_timer.durations, price_timer.failures),
+        "end_to_end": (end_to_end, 0),
+    }
+    return {
+        "listings": len(results),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "listings_per_s": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "priced": sum(1 for r in results if r.price),
+        # Scraped prices that do not match the served fixture (e.g. "$1" for "$1,234.56")
+        "wrong_prices": sum(1 for r in results if r.price and r.price != stub.expected_price(r.link)),
+        "errors": sum(1 for r in results if r.error),
+        "stages": {
+            name: {
+                "calls": len(durations),
+                "failures": failures,
+                **{f"p{pct}_ms": round(percentile(durations, pct) * 1000, 1) for pct in (50, 95, 99)},
+            }
+            for name, (durations, failures) in stages.items()
+        },
+        "traced_peak_mb": round(peak_mb, 1) if peak_mb is not None else None,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "engine": engine.stats(),
+        "rate_limits": limiter_stats(),
+    }
+
+
+def print_report(cases):
+    header = (f"{'listings':>8} {'conc':>5} {'secs':>7} {'list/s':>8} {'priced':>7} {'wrong':>6} {'errors':>6}"
+              f"  stage p50/p95/p99 ms")
+    print(header)
+    print("-" * len(header))
+    for case in cases:
+        print(f"{case['listings']:>8} {case['concurrency']:>5} {case['seconds']:>7.2f} {case['listings_per_s']:>8.1f} "
+              f"{case['priced']:>7} {case['wrong_prices']:>6} {case['errors']:>6}")
+        for name, stage in case["stages"].items():
+            print(f"{'':>53}{name:<12} {stage['p50_ms']:>8.1f} {stage['p95_ms']:>8.1f} {stage['p99_ms']:>8.1f}"
+                  f"   ({stage['calls']} calls)")
+        memory = f"max RSS {case['max_rss_mb']} MB"
+        if case["traced_peak_mb"] is not None:
+            memory += f", traced peak {case['traced_peak_mb']} MB"
+        print(f"{'':>53}{memory}")
+        for host, limits in case["rate_limits"].items():
+            print(f"{'':>53}{host}: limit {limits['limit']}, {limits['throttles']} throttles")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", default="200,1000", help="comma-separated listing counts (default 200,1000)")
+    parser.add_argument("--concurrency", default="4,16",
+                        help="comma-separated SerpAPI/PriceCharting concurrency limits (default 4,16)")
+    parser.add_argument("--products", type=int, default=0,
+                        help="distinct cards the listings are spread over (default: a quarter of the listings)")
+    parser.add_argument("--latency-ms", default=DEFAULT_LATENCY_MS,
+                        help=f"mean stub latency per upstream (default {DEFAULT_LATENCY_MS})")
+    parser.add_argument("--error-rate", default="0",
+                        help="share of stub responses that are 500s, e.g. 0.02 or serpapi=0.05")
+    parser.add_argument("--throttle-rate", default="0",
+                        help="share of stub responses that are 429s, to exercise the adaptive rate limiter")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="measure the traced Python heap peak per run (slower)")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the scrapers' debug output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    listing_counts = [int(n) for n in args.listings.split(",")]
+    concurrencies = [int(n) for n in args.concurrency.split(",")]
+
+    stub = StubUpstreams(parse_upstream_values(args.latency_ms), parse_upstream_values(args.error_rate),
+                         products=args.products or max(1, max(listing_counts) // 4),
+                         throttle_rate=parse_upstream_values(args.throttle_rate)).start()
+
+    # Point the tools at the stub and keep their caches out of the user's cache directory
+    os.environ["EBAY_API_BASE"] = stub.base_url
+    os.environ["SERPAPI_BASE"] = stub.base_url
+    os.environ["EBAY_PROFIT_CACHE_DIR"] = tempfile.mkdtemp(prefix="ebay-profit-bench-")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Common import config, ebay_search, http_session, pricecharting, rate_limit
+    http_session.HOST_POOL_SIZES["127.0.0.1"] = 4 * max(concurrencies) + 16
+    # The stub serves every upstream from one host; start its limiter wide open so
+    # only the engine limits apply until it is throttled
+    rate_limit.HOST_RATE_LIMITS["127.0.0.1"] = dict(rate_limit.DEFAULT_RATE_LIMIT, initial=4 * max(concurrencies) + 16,
+                                                    max_limit=4 * max(concurrencies) + 16)
+
+    cases = []
+    try:
+        for run, (listings, concurrency) in enumerate((n, c) for n in listing_counts for c in concurrencies):
+            # A fresh tag per run means fresh titles, so no run is served from an earlier run's caches
+            cases.append(run_case((config, ebay_search, pricecharting, rate_limit.limiter_stats), stub, f"BENCH{run}",
+                                  listings, concurrency, args.trace_memory, args.verbose))
+    finally:
+        stub.stop()
+
+    print_report(cases)
+    print(f"\nstub requests: {stub.requests}, injected errors: {stub.errors}, injected 429s: {stub.throttled}")
+    wrong = sum(case["wrong_prices"] for case in cases)
+    if wrong:
+        print(f"{wrong} scraped prices did not match the served product page", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"cases": cases, "stub_requests": stub.requests, "stub_errors": stub.errors,
+                       "stub_throttled": stub.throttled}, f, indent=2)
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
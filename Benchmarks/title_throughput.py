@@ -0,0 +1,81 @@
+"""
+Throughput of listing-title parsing: the old per-call regex helpers vs the
+precompiled, memoized Common.title_analysis.
+
+    python Benchmarks/title_throughput.py [--titles 200000] [--unique 50000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.title_analysis import analyze_titles, clear_title_cache
+
+YEARS = ["", "1999 ", "2016 ", "2021 ", "2023 "]
+NAMES = ["Charizard", "Pikachu", "Umbreon VMAX", "Mewtwo GX", "Rayquaza", "Lugia V Alt Art", "Blastoise",
+         "Gengar", "Mew ex", "Eevee", "Giratina V", "Moonbreon", "Dragonite", "Snorlax", "Greninja"]
+SETS = ["Base Set", "Evolving Skies", "151", "Crown Zenith", "Hidden Fates", "Jungle", "Fusion Strike", ""]
+NUMBERS = ["4/102", "#215", "199/165", "TG05/TG30", "SV049", "#025", ""]
+GRADES = ["PSA 10", "PSA 9", "BGS 9.5", "CGC 8.5", "SGC 10", "PSA GEM MINT 10", "Beckett 9", "Raw NM", "Ungraded", ""]
+EXTRAS = ["", " Gem Mint", " Holo Rare", " L@@K", " English", " Fresh Slab", " Free Shipping"]
+
+
+def make_corpus(count, unique, seed=7):
+    rng = random.Random(seed)
+    distinct = [
+        " ".join(filter(None, (rng.choice(YEARS).strip(), "Pokemon", rng.choice(NAMES), rng.choice(SETS),
+                               rng.choice(NUMBERS), rng.choice(GRADES)))) + rng.choice(EXTRAS) + f" {n}"
+        for n in range(unique)
+    ]
+    return [rng.choice(distinct) for _ in range(count)]
+
+
+def legacy_clean_title(title):
+    title_upper = title.upper()
+    grade_match = re.search(r'\b(PSA|BGS|CGC)\s?\d{1,2}\b', title_upper)
+    grade = grade_match.group(0) if grade_match else ""
+    name_part = title_upper.split(grade)[0] if grade else title_upper
+    name_tokens = re.findall(r'\b[A-Z][a-zA-Z0-9\-\']{2,}\b', name_part)
+    return f"{' '.join(name_tokens[:3])} {grade}".strip()
+
+
+def legacy_grade(title):
+    grade_match = re.search(r'(PSA|CGC|BGS)\s*(\d+(\.\d+)?)', title, re.IGNORECASE)
+    if grade_match:
+        return f"{grade_match.group(1).upper()} {grade_match.group(2)}"
+    return "Ungraded"
+
+
+def legacy(titles):
+    return [(legacy_clean_title(title), legacy_grade(title)) for title in titles]
+
+
+def timed(fn, titles):
+    start = time.perf_counter()
+    fn(titles)
+    return len(titles) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--titles", type=int, default=200_000, help="titles in the corpus (default 200000)")
+    parser.add_argument("--unique", type=int, default=50_000, help="distinct titles among them (default 50000)")
+    args = parser.parse_args()
+
+    titles = make_corpus(args.titles, args.unique)
+    clear_title_cache()
+    rows = [
+        ("legacy helpers", timed(legacy, titles)),
+        ("analyze_titles (cold)", timed(analyze_titles, titles)),
+        ("analyze_titles (warm)", timed(analyze_titles, titles)),
+    ]
+    print(f"{len(titles)} titles, {args.unique} distinct")
+    for name, rate in rows:
+        print(f"{name:<24}{rate:>14,.0f} titles/s")
+
+
+if __name__ == "__main__":
+    main()
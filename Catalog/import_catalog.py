@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.catalog import CSV_READERS, get_catalog
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import PriceCharting/TCGPlayer catalog exports for offline title matching.")
+    parser.add_argument("files", nargs="*", help="CSV exports to import")
+    parser.add_argument("-s", "--source", choices=sorted(CSV_READERS),
+                        help="export format (default: detected from the CSV header)")
+    parser.add_argument("-m", "--match", action="append", default=[], metavar="TITLE",
+                        help="show the best catalog match for an eBay title (repeatable)")
+    parser.add_argument("--site", choices=sorted(CSV_READERS), default="pricecharting",
+                        help="catalog searched by --match")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    catalog = get_catalog()
+
+    for path in args.files:
+        start = time.perf_counter()
+        count = catalog.import_csv(path, args.source)
+        print(f"{path}: {count} products imported in {time.perf_counter() - start:.1f}s")
+
+    for title in args.match:
+        start = time.perf_counter()
+        match = catalog.best_match(title, args.site)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        if match is None:
+            print(f"{title!r}: no candidates ({elapsed_us:.0f} µs)")
+        else:
+            print(f"{title!r}: {match.product.name} [{match.product.set_name}] "
+                  f"confidence {match.confidence:.2f} ({elapsed_us:.0f} µs)\n    {match.product.url or '(no URL in export)'}")
+
+    print(f"Catalog: {catalog.count('pricecharting')} PriceCharting, {catalog.count('tcgplayer')} TCGPlayer products")
+
+
+if __name__ == "__main__":
+    main()
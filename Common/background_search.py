@@ -0,0 +1,85 @@
+import queue
+import threading
+
+POLL_MS = 50
+# Upper bound on queued events handled per poll so the UI keeps repainting
+MAX_EVENTS_PER_POLL = 200
+
+
+class BackgroundSearch:
+    """
+    Runs a ComparisonEngine search on a worker thread and replays its events on
+    the Tk thread.
+
+    The engine callbacks only put events on a thread-safe queue; the Tk loop
+    drains it with `after()` and hands each poll's events over in batches:
+      on_listings(items)     eBay listings that arrived since the last poll
+      on_results(results)    price lookups that finished since the last poll
+      on_done(results)       once every lookup has finished
+      on_error(exc)          if the search itself failed
+    Batching lets the viewers do their profit math once per poll instead of
+    once per row. `pending` is the number of lookups still running.
+    """
+
+    def __init__(self, root, engine, on_listings, on_results, on_done, on_error):
+        self.root = root
+        self.engine = engine
+        self.on_listings = on_listings
+        self.on_results = on_results
+        self.on_done = on_done
+        self.on_error = on_error
+        self.pending = 0
+        self.running = False
+        self._events = queue.Queue()
+
+    def start(self, query):
+        if self.running:
+            return False
+        self.running = True
+        self.pending = 0
+        worker = threading.Thread(target=self._work, args=(query,), daemon=True)
+        worker.start()
+        self.root.after(POLL_MS, self._drain)
+        return True
+
+    def _work(self, query):
+        try:
+            results = self.engine.run(
+                query,
+                on_result=lambda result: self._events.put(("result", result)),
+                on_listing=lambda item: self._events.put(("listing", item)),
+            )
+            self._events.put(("done", results))
+        except Exception as e:
+            self._events.put(("error", e))
+
+    def _drain(self):
+        listings, results, final = [], [], None
+        for _ in range(MAX_EVENTS_PER_POLL):
+            try:
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "listing":
+                listings.append(payload)
+            elif kind == "result":
+                results.append(payload)
+            else:
+                final = (kind, payload)
+                break
+
+        self.pending += len(listings) - len(results)
+        if listings:
+            self.on_listings(listings)
+        if results:
+            self.on_results(results)
+
+        if final is None:
+            self.root.after(POLL_MS, self._drain)
+            return
+        self.running = False
+        kind, payload = final
+        if kind == "done":
+            self.on_done(payload)
+        else:
+            self.on_error(payload)
@@ -0,0 +1,373 @@
+import csv
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+
+from .disk_cache import cache_file
+from .metrics import count
+from .title_analysis import GRADE_RE, GRADERS, GRADER_ALIASES, NOISE_WORDS, analyze_title
+
+CATALOG_FILE = "catalog.sqlite3"
+# Matches scoring below this are handed to SerpAPI instead
+MIN_CONFIDENCE = 0.75
+# A runner-up this close to the best match makes the match ambiguous
+AMBIGUITY_MARGIN = 0.05
+NUMBER_BONUS = 0.2
+NUMBER_PENALTY = 0.4
+MISSING_GRADE_PENALTY = 0.1
+# Tokens in more than this share of products ("POKEMON", "HOLO") are not used to find candidates
+COMMON_TOKEN_SHARE = 0.2
+MATCH_CACHE_SIZE = 65536
+
+# Columns of a PriceCharting price guide export and the grade each one holds for trading cards
+PRICECHARTING_GRADE_COLUMNS = {
+    "loose-price": "Ungraded",
+    "cib-price": "Grade 7",
+    "new-price": "Grade 8",
+    "graded-price": "Grade 9",
+    "box-only-price": "Grade 9.5",
+    "manual-only-price": "PSA 10",
+    "bgs-10-price": "BGS 10",
+    "condition-17-price": "CGC 10",
+    "condition-18-price": "SGC 10",
+}
+# Columns that may hold the product page URL. The standard price guide export has none,
+# and its page slugs cannot be rebuilt reliably from the names.
+PRICECHARTING_URL_COLUMNS = ("url", "product-url")
+
+TOKEN_SPLIT_RE = re.compile(r"[A-Z0-9]+")
+CARD_NUMBER_RE = re.compile(r"^([A-Z]*)0*(\d)")
+SKIP_TOKENS = NOISE_WORDS | frozenset(GRADERS) | frozenset(GRADER_ALIASES)
+
+
+def tokenize(text):
+    return {token for token in TOKEN_SPLIT_RE.findall(text.upper())
+            if token not in SKIP_TOKENS and (len(token) > 1 or token.isdigit())}
+
+
+def card_number(text):
+    """
+    Normalizes a printed card number: "#004" -> "4", "4/102" -> "4", "TG05/TG30" -> "TG5".
+    """
+    if not text:
+        return None
+    number = text.upper().split("/")[0].strip().lstrip("#").strip()
+    return CARD_NUMBER_RE.sub(r"\1\2", number) or None
+
+
+def parse_money(text):
+    try:
+        value = float(str(text).replace("$", "").replace(",", "").strip())
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def price_for_grade(prices, grader, grade):
+    """
+    Catalog price for a listing grade: the exact label ("PSA 9"), then the
+    generic "Grade 9" column, then Ungraded for raw cards.
+    """
+    if not grader:
+        return prices.get("Ungraded")
+    return prices.get(f"{grader} {grade}") or prices.get(f"Grade {grade}")
+
+
+class Product:
+    """
+    One catalog product. `prices` maps grade labels ("Ungraded", "PSA 10",
+    "Grade 9") to the export's price in dollars.
+    """
+    __slots__ = ("site", "product_id", "name", "set_name", "number", "url", "prices")
+
+    def __init__(self, site, product_id, name, set_name, number, url, prices):
+        self.site = site
+        self.product_id = product_id
+        self.name = name
+        self.set_name = set_name
+        self.number = number
+        self.url = url
+        self.prices = prices
+
+    def __repr__(self):
+        return f"Product({self.site!r}, {self.product_id!r}, {self.name!r}, {self.set_name!r})"
+
+
+class CatalogMatch:
+    __slots__ = ("product", "confidence")
+
+    def __init__(self, product, confidence):
+        self.product = product
+        self.confidence = confidence
+
+
+def read_pricecharting_csv(stream):
+    """
+    Yields Products from a PriceCharting price guide CSV export. Products
+    keep an empty URL unless the export has a URL column.
+    """
+    for row in csv.DictReader(stream):
+        name = row.get("product-name", "").strip()
+        set_name = row.get("console-name", "").strip()
+        if not row.get("id") or not name:
+            continue
+        prices = {}
+        for column, grade in PRICECHARTING_GRADE_COLUMNS.items():
+            price = parse_money(row.get(column, ""))
+            if price is not None:
+                prices[grade] = price
+        number = name.rsplit("#", 1)[1] if "#" in name else None
+        url = next((row[column].strip() for column in PRICECHARTING_URL_COLUMNS
+                    if (row.get(column) or "").strip()), "")
+        yield Product("pricecharting", row["id"], name, set_name, card_number(number), url, prices)
+
+
+def read_tcgplayer_csv(stream):
+    """
+    Yields Products from a TCGPlayer catalog/pricing CSV export. Exports list
+    one row per condition; the Near Mint market price is kept as Ungraded.
+    """
+    products = {}
+    for row in csv.DictReader(stream):
+        product_id = (row.get("TCGplayer Id") or row.get("Product ID") or "").strip()
+        name = (row.get("Product Name") or "").strip()
+        if not product_id or not name:
+            continue
+        price = parse_money(row.get("TCG Market Price") or row.get("Market Price") or "")
+        product = products.get(product_id)
+        if product is None:
+            product = products[product_id] = Product(
+                "tcgplayer", product_id, name, (row.get("Set Name") or "").strip(),
+                card_number(row.get("Number")), f"https://www.tcgplayer.com/product/{product_id}", {},
+            )
+        condition = row.get("Condition") or ""
+        if price is not None and ("Ungraded" not in product.prices or "Near Mint" in condition):
+            product.prices["Ungraded"] = price
+    return iter(products.values())
+
+
+CSV_READERS = {
+    "pricecharting": read_pricecharting_csv,
+    "tcgplayer": read_tcgplayer_csv,
+}
+
+
+def detect_source(fieldnames):
+    fields = set(fieldnames or ())
+    if "product-name" in fields and "console-name" in fields:
+        return "pricecharting"
+    if "Product Name" in fields and ("TCGplayer Id" in fields or "Product ID" in fields):
+        return "tcgplayer"
+    return None
+
+
+class _SiteIndex:
+    """
+    In-memory inverted index over one site's products.
+    """
+
+    def __init__(self, products):
+        self.products = products
+        self.tokens = [frozenset(tokenize(f"{p.name.split('#')[0]} {p.set_name}")) for p in products]
+        postings = defaultdict(list)
+        for i, tokens in enumerate(self.tokens):
+            for token in tokens:
+                postings[token].append(i)
+        count = max(1, len(products))
+        self.postings = dict(postings)
+        self.idf = {token: math.log(1 + count / len(rows)) for token, rows in postings.items()}
+        self.weights = [sum(self.idf[t] for t in tokens) or 1.0 for tokens in self.tokens]
+        self.common_df = max(1, int(count * COMMON_TOKEN_SHARE))
+
+    def match(self, title):
+        info = analyze_title(title)
+        query = tokenize(GRADE_RE.sub(" ", title.upper()))
+        known = [t for t in query if t in self.postings]
+        rare = [t for t in known if len(self.postings[t]) <= self.common_df] or known
+        candidates = set()
+        for token in rare:
+            candidates.update(self.postings[token])
+        if not candidates:
+            return None
+
+        number = card_number(info.set_number)
+        scores = []
+        for i in candidates:
+            product = self.products[i]
+            score = sum(self.idf[t] for t in self.tokens[i] if t in query) / self.weights[i]
+            if number and product.number:
+                score += NUMBER_BONUS if number == product.number else -NUMBER_PENALTY
+            if product.prices and price_for_grade(product.prices, info.grader, info.grade) is None:
+                score -= MISSING_GRADE_PENALTY
+            scores.append((score, i))
+        scores.sort(reverse=True)
+
+        best, i = scores[0]
+        confidence = min(best, 1.0)
+        if len(scores) > 1 and best - scores[1][0] < AMBIGUITY_MARGIN:
+            confidence -= AMBIGUITY_MARGIN * 4
+        return CatalogMatch(self.products[i], max(confidence, 0.0))
+
+
+class Catalog:
+    """
+    Local product catalog imported from PriceCharting/TCGPlayer CSV exports.
+
+    Products live in SQLite; an inverted token index per site is built in
+    memory on first use. `match(title, site)` scores candidates by the share of
+    the product name found in the title (IDF weighted), the card number and
+    whether the product has a price for the listing's grade, and returns a
+    match only when it is confident enough to skip a SerpAPI search.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._indexes = {}
+        self._matches = {}
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                " site TEXT NOT NULL,"
+                " product_id TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " set_name TEXT NOT NULL,"
+                " number TEXT,"
+                " url TEXT NOT NULL,"
+                " prices TEXT NOT NULL,"
+                " PRIMARY KEY (site, product_id))"
+            )
+
+    def add_products(self, products):
+        """
+        Inserts or replaces products and returns how many were written. A
+        product imported without a URL keeps the one learned earlier (see
+        resolve_url).
+        """
+        rows = [(p.site, p.product_id, p.name, p.set_name, p.number, p.url, json.dumps(p.prices))
+                for p in products]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (site, product_id) DO UPDATE SET"
+                " name = excluded.name, set_name = excluded.set_name, number = excluded.number,"
+                " url = CASE WHEN excluded.url != '' THEN excluded.url ELSE products.url END,"
+                " prices = excluded.prices",
+                rows,
+            )
+            self._indexes.clear()
+            self._matches.clear()
+        return len(rows)
+
+    def import_csv(self, path, source=None):
+        """
+        Loads a catalog export. `source` is "pricecharting" or "tcgplayer";
+        when omitted it is detected from the CSV header.
+        """
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            if source is None:
+                source = detect_source(csv.DictReader(f).fieldnames)
+                if source is None:
+                    raise ValueError(f"Unrecognized catalog export: {path}")
+                f.seek(0)
+            return self.add_products(CSV_READERS[source](f))
+
+    def set_url(self, product, url):
+        """
+        Stores a product URL found by a SerpAPI lookup, for this and later runs.
+        """
+        product.url = url
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE products SET url = ? WHERE site = ? AND product_id = ?",
+                               (url, product.site, product.product_id))
+
+    def count(self, site=None):
+        with self._lock:
+            if site is None:
+                return self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM products WHERE site = ?", (site,)).fetchone()[0]
+
+    def _index(self, site):
+        index = self._indexes.get(site)
+        if index is None:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT site, product_id, name, set_name, number, url, prices FROM products WHERE site = ?",
+                    (site,),
+                ).fetchall()
+            index = _SiteIndex([Product(*row[:6], json.loads(row[6])) for row in rows])
+            self._indexes[site] = index
+        return index
+
+    def best_match(self, title, site):
+        """
+        The best scoring product for `title`, whatever its confidence, or None.
+        """
+        key = (site, title)
+        if key in self._matches:
+            return self._matches[key]
+        index = self._index(site)
+        match = index.match(title) if index.products else None
+        if len(self._matches) >= MATCH_CACHE_SIZE:
+            self._matches.clear()
+        self._matches[key] = match
+        return match
+
+    def match(self, title, site, min_confidence=None):
+        """
+        Returns a CatalogMatch when the local catalog is confident enough, else None.
+        """
+        match = self.best_match(title, site)
+        threshold = MIN_CONFIDENCE if min_confidence is None else min_confidence
+        if match is None or match.confidence < threshold:
+            return None
+        return match
+
+    def resolve_url(self, title, site, fallback):
+        """
+        Product URL from the catalog, or `fallback(title)` (a SerpAPI lookup)
+        when no confident local match exists. A matched product without a URL
+        (standard PriceCharting exports have none) keeps the first URL its
+        fallback finds, so later listings matching it skip SerpAPI.
+        """
+        match = self.match(title, site)
+        if match is None:
+            count("catalog", result="miss")
+            return fallback(title)
+        if match.product.url:
+            count("catalog", result="hit")
+            return match.product.url
+        count("catalog", result="miss")
+        url = fallback(title)
+        if url:
+            self.set_url(match.product, url)
+        return url
+
+    def resolve_key(self, title, site, fallback_key):
+        """
+        Engine coalescing key: listings matched to the same catalog product
+        share one lookup; the rest fall back to `fallback_key(title)`.
+        """
+        match = self.match(title, site)
+        return ("catalog", site, match.product.product_id) if match else fallback_key(title)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = Catalog(cache_file(CATALOG_FILE))
+        return _catalog
@@ -0,0 +1,261 @@
+import asyncio
+import math
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+from .deadline_scheduler import DeadlineSkipped, DeadlineTracker, PrioritySemaphore, SharedPriority, listing_deadline
+from .metrics import metrics
+from .single_flight import AsyncSingleFlight
+
+# How many calls may be in flight against each upstream at once
+DEFAULT_LIMITS = {
+    "ebay": 4,
+    "serpapi": 8,
+    "pricecharting": 16,
+    "tcgplayer": 4,
+}
+# Limit for a provider upstream missing from DEFAULT_LIMITS
+DEFAULT_PROVIDER_LIMIT = 4
+
+_END = object()
+
+
+class Quote:
+    """
+    What one price provider found for a listing.
+    """
+    __slots__ = ("price", "link", "error")
+
+    def __init__(self, price=None, link=None, error=None):
+        self.price = price
+        self.link = link
+        self.error = error
+
+
+class ComparisonResult:
+    """
+    One eBay listing together with the market prices found for it.
+
+    `quotes` maps each provider name to its Quote. `price` and `link` are the
+    first provider's, and `error` is the first error of any provider, so
+    single-source callers can ignore `quotes` altogether.
+    """
+    __slots__ = ("item", "price", "link", "error", "quotes")
+
+    def __init__(self, item, price=None, link=None, error=None, quotes=None):
+        self.item = item
+        self.price = price
+        self.link = link
+        self.error = error
+        self.quotes = quotes or {}
+
+    @classmethod
+    def from_quotes(cls, item, quotes):
+        first = next(iter(quotes.values()))
+        error = next((quote.error for quote in quotes.values() if quote.error), None)
+        return cls(item, first.price, first.link, error, quotes)
+
+
+class ComparisonEngine:
+    """
+    Runs the eBay search -> product URL -> market price chain on asyncio.
+
+    `search(query)` is the blocking eBay search returning Listing records;
+    every listing is then looked up with each PriceProvider (see providers)
+    at the same time, so one eBay search feeds every source and a listing
+    takes as long as its slowest provider. Each stage runs in a shared thread
+    pool behind a per-upstream semaphore, so hundreds of lookups can be queued
+    while only `sum(limits)` threads ever exist.
+
+    Listings are keyed by eBay itemId. Concurrent lookups of one provider that
+    map to the same `resolve_key(title)` or `price_key(url, title)` share one
+    in-flight call.
+
+    Waiting lookups get upstream slots in order of their auction end time (a
+    shared lookup by the earliest of its listings' end times), and lookups that cannot finish before the auction ends (see DeadlineTracker and
+    `deadline_margin`) are skipped with a DeadlineSkipped error.
+    """
+
+    def __init__(self, search, providers, limits=None, deadline_margin=config.LOOKUP_DEADLINE_MARGIN):
+        if not providers:
+            raise ValueError("ComparisonEngine needs at least one price provider")
+        self.search = search
+        self.providers = list(providers)
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        upstreams = {provider.upstream for provider in self.providers}
+        for upstream in upstreams:
+            self.limits.setdefault(upstream, DEFAULT_PROVIDER_LIMIT)
+        threads = self.limits["ebay"] + self.limits["serpapi"] + sum(self.limits[name] for name in upstreams)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="compare")
+        self._loop = None
+        self._semaphores = None
+        self._resolve_flight = None
+        self._price_flight = None
+        self._flight_priorities = None
+        self.coalesced_resolves = 0
+        self.coalesced_prices = 0
+        self.duplicate_listings = 0
+        self.reused_results = 0
+        self.deadlines = DeadlineTracker(deadline_margin)
+        self._active_compares = 0
+
+    def _bind_loop(self):
+        # Semaphores belong to one event loop; several compares on the same loop share them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphores = {name: PrioritySemaphore(limit) for name, limit in self.limits.items()}
+            self._resolve_flight = AsyncSingleFlight()
+            self._price_flight = AsyncSingleFlight()
+            # Entries disappear once no in-flight call holds their priority
+            self._flight_priorities = weakref.WeakValueDictionary()
+            self.duplicate_listings = 0
+
+    async def _call(self, upstream, fn, *args, priority=math.inf, stage=None, service=None):
+        # `service` collects the time spent holding the slot, without the queue wait
+        queued = time.perf_counter()
+        async with self._semaphores[upstream].slot(priority):
+            started = time.perf_counter()
+            metrics.observe(f"{upstream}_queue_wait", started - queued)
+            if stage:
+                fn = metrics.timed(stage)(fn)
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._executor, fn, *args)
+            finally:
+                if service is not None:
+                    service.append(time.perf_counter() - started)
+
+    async def _iter_search(self, query):
+        results = await self._call("ebay", lambda: iter(self.search(query)))
+        while True:
+            item = await self._call("ebay", next, results, _END)
+            if item is _END:
+                return
+            yield item
+
+    def _flight_priority(self, key, deadline):
+        # A listing joining a shared lookup pulls it forward to its own deadline if that is sooner
+        priority = self._flight_priorities.get(key)
+        if priority is None:
+            priority = self._flight_priorities[key] = SharedPriority(deadline)
+        else:
+            priority.lower(deadline)
+        return priority
+
+    async def _quote(self, provider, title, deadline, service):
+        link = None
+        try:
+            key = (provider.name, "resolve", provider.resolve_key(title))
+            priority = self._flight_priority(key, deadline)
+            link = await self._resolve_flight.do(
+                key,
+                lambda: self._call("serpapi", provider.resolve_url, title, priority=priority, stage="resolve_url",
+                                   service=service),
+            )
+            price = None
+            if link:
+                key = (provider.name, "price", provider.price_key(link, title))
+                priority = self._flight_priority(key, deadline)
+                price = await self._price_flight.do(
+                    key,
+                    lambda: self._call(provider.upstream, provider.fetch_price, link, title, priority=priority,
+                                       stage="fetch_price", service=service),
+                )
+            return Quote(price, link)
+        except Exception as e:
+            print(f"[DEBUG] {provider.label} comparison error for '{title}':", e)
+            # A product link found before the price fetch failed still lets the user check by hand
+            return Quote(link=link, error=e)
+
+    async def compare_item(self, item):
+        deadline = listing_deadline(item)
+        if self.deadlines.should_skip(deadline):
+            error = DeadlineSkipped("auction ends before the lookup could finish")
+            return ComparisonResult.from_quotes(item, {provider.name: Quote(error=error)
+                                                       for provider in self.providers})
+        # Upstream time per provider; lookups shared with another listing cost this one nothing
+        service = [[] for _ in self.providers]
+        # Every provider looks the listing up at once; the slowest one sets the pace
+        quotes = await asyncio.gather(*(self._quote(provider, item.title, deadline, times)
+                                        for provider, times in zip(self.providers, service)))
+        self.deadlines.finished(deadline, max(sum(times) for times in service))
+        return ComparisonResult.from_quotes(item, {provider.name: quote
+                                                   for provider, quote in zip(self.providers, quotes)})
+
+    async def compare(self, query, on_result=None, on_listing=None, known=None):
+        """
+        Searches eBay for `query` and looks up every provider's market price for
+        every listing.
+        Lookups start as soon as each listing arrives. `on_listing` is called with
+        every eBay item as it arrives and `on_result` with every ComparisonResult
+        as it completes; the full list is returned.
+
+        `known(item)` may return an earlier ComparisonResult for a listing that
+        has not changed; it is reported as-is instead of being looked up again.
+        """
+        self._bind_loop()
+        if not self._active_compares:
+            # Lookup times of an earlier search say little about this one's upstreams
+            self.deadlines.reset_estimate()
+        self._active_compares += 1
+        try:
+            return await self._compare(query, on_result, on_listing, known)
+        finally:
+            self._active_compares -= 1
+
+    async def _compare(self, query, on_result, on_listing, known):
+        tasks = {}
+        try:
+            async for item in self._iter_search(query):
+                item_id = item.item_id or id(item)
+                if item_id in tasks:
+                    # Overlapping result pages can repeat a listing
+                    self.duplicate_listings += 1
+                    continue
+                if on_listing:
+                    on_listing(item)
+                previous = known(item) if known else None
+                if previous is not None:
+                    self.reused_results += 1
+                    tasks[item_id] = asyncio.get_running_loop().create_future()
+                    tasks[item_id].set_result(previous)
+                else:
+                    tasks[item_id] = asyncio.create_task(self.compare_item(item))
+
+            results = []
+            for next_done in asyncio.as_completed(tasks.values()):
+                result = await next_done
+                if on_result:
+                    on_result(result)
+                results.append(result)
+        finally:
+            # A failed search or callback (or a cancelled compare) must not leave lookups running unowned
+            pending = [task for task in tasks.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        self.coalesced_resolves = self._resolve_flight.shared
+        self.coalesced_prices = self._price_flight.shared
+        return results
+
+    def stats(self):
+        return {
+            "coalesced_resolves": self.coalesced_resolves,
+            "coalesced_prices": self.coalesced_prices,
+            "duplicate_listings": self.duplicate_listings,
+            "reused_results": self.reused_results,
+            **self.deadlines.stats(),
+        }
+
+    def run(self, query, on_result=None, on_listing=None):
+        """
+        Blocking wrapper around `compare` for callers without an event loop.
+        """
+        return asyncio.run(self.compare(query, on_result, on_listing))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,36 @@
+import os
+
+# --- API Keys and Tokens ---
+# Paste your keys here, or set the environment variables of the same name.
+# A pasted eBay OAuth token expires after two hours; see EBAY_CLIENT_ID below.
+EBAY_OAUTH_TOKEN = os.environ.get("EBAY_OAUTH_TOKEN", r"""PUT EBAY OAUTH TOKEN HERE""")
+SERPAPI_KEY = os.environ.get("SERPAPI_KEY", "PUT SERP API KEY HERE")
+
+# eBay application keys (developer.ebay.com -> Application Keys). When both are set,
+# application tokens are minted and refreshed automatically and EBAY_OAUTH_TOKEN is not used.
+EBAY_CLIENT_ID = os.environ.get("EBAY_CLIENT_ID", "")
+EBAY_CLIENT_SECRET = os.environ.get("EBAY_CLIENT_SECRET", "")
+EBAY_OAUTH_SCOPE = "https://api.ebay.com/oauth/api_scope"
+
+# Upstream API roots; only changed to point the tools at local stand-ins (see Benchmarks/)
+EBAY_API_BASE = os.environ.get("EBAY_API_BASE", "https://api.ebay.com")
+SERPAPI_BASE = os.environ.get("SERPAPI_BASE", "https://serpapi.com")
+
+# How many eBay results a search loads (eBay stops at 10,000). They are fetched
+# in pages of up to 200, several pages at a time; EBAY_MAX_RESULTS overrides it
+MAX_RESULTS = int(os.environ.get("EBAY_MAX_RESULTS", "1000"))
+PAGE_FETCH_WORKERS = 4
+
+# Price lookups for auctions ending sooner than this many seconds are skipped
+# (None looks up everything); lookups always run in order of auction end time
+LOOKUP_DEADLINE_MARGIN = 15
+
+# Market price sources the multi-source viewer and headless `--source all`
+# compare every listing against (see providers.PROVIDERS)
+PRICE_PROVIDERS = ("pricecharting", "tcgplayer")
+
+# Browser scrapes run in this many separate worker processes (0 runs them on
+# threads in the calling process); a scrape running longer than
+# SCRAPE_JOB_TIMEOUT seconds has its worker and browser killed and replaced
+SCRAPE_WORKER_PROCESSES = 4
+SCRAPE_JOB_TIMEOUT = 60
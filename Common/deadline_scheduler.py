@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+# Weight of the newest lookup in the running estimate of how long a lookup takes
+DURATION_SMOOTHING = 0.2
+
+
+def listing_deadline(listing):
+    """
+    Epoch seconds at which the listing ends, or infinity when unknown.
+    """
+    try:
+        return datetime.fromisoformat(listing.end_date.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return math.inf
+
+
+class SharedPriority:
+    """
+    Priority of a lookup that several listings wait on: the earliest of their
+    deadlines. `lower(deadline)` moves the lookup up the queue of the
+    PrioritySemaphore it is waiting on, if any.
+    """
+    __slots__ = ("value", "_queued", "__weakref__")
+
+    def __init__(self, value=math.inf):
+        self.value = value
+        self._queued = None
+
+    def lower(self, value):
+        if value >= self.value:
+            return
+        self.value = value
+        if self._queued is not None:
+            semaphore, waiter = self._queued
+            semaphore._push(value, waiter)
+
+
+class PrioritySemaphore:
+    """
+    asyncio semaphore that hands free slots to the waiter with the lowest
+    priority value first (FIFO among equals), so lookups for auctions ending
+    soonest run before ones ending next week. `priority` is a number or a
+    SharedPriority, which can still be lowered while waiting.
+    """
+
+    def __init__(self, value):
+        self._value = value
+        self._waiters = []
+        self._order = itertools.count()
+
+    def _push(self, priority, waiter):
+        # A re-prioritised waiter is pushed again; its older entry is skipped once it is done
+        heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+
+    async def acquire(self, priority=math.inf):
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        shared = priority if isinstance(priority, SharedPriority) else None
+        waiter = asyncio.get_running_loop().create_future()
+        self._push(shared.value if shared else priority, waiter)
+        if shared:
+            shared._queued = (self, waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.release()
+            raise
+        finally:
+            if shared:
+                shared._queued = None
+
+    def release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._value += 1
+
+    @asynccontextmanager
+    async def slot(self, priority=math.inf):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @property
+    def waiting(self):
+        return len({id(waiter) for _, _, waiter in self._waiters if not waiter.done()})
+
+
+class DeadlineTracker:
+    """
+    Decides whether a lookup can still finish before its auction ends and
+    counts how many lookups met, missed or skipped their deadline.
+
+    A lookup is skipped when the time left is below `margin` seconds or below
+    the running average lookup time, whichever is larger. The average is of
+    service time only (time spent holding upstream slots), since a soon-ending
+    lookup jumps the queue anyway. `margin=None` disables skipping; deadlines
+    are still tracked.
+    """
+
+    def __init__(self, margin=None):
+        self.margin = margin
+        self.estimate = 0.0
+        self.met = 0
+        self.missed = 0
+        self.skipped = 0
+
+    def should_skip(self, deadline, now=None):
+        if self.margin is None or deadline == math.inf:
+            return False
+        time_left = deadline - (now or time.time())
+        if time_left < max(self.margin, self.estimate):
+            self.skipped += 1
+            return True
+        return False
+
+    def reset_estimate(self):
+        self.estimate = 0.0
+
+    def finished(self, deadline, duration, now=None):
+        """
+        Records a lookup that took `duration` seconds of upstream time.
+        """
+        now = now or time.time()
+        self.estimate = duration if not self.estimate else (
+            DURATION_SMOOTHING * duration + (1 - DURATION_SMOOTHING) * self.estimate)
+        if deadline == math.inf:
+            return
+        if now <= deadline:
+            self.met += 1
+        else:
+            self.missed += 1
+
+    def stats(self):
+        return {
+            "deadlines_met": self.met,
+            "deadlines_missed": self.missed,
+            "deadlines_skipped": self.skipped,
+            "lookup_estimate_s": round(self.estimate, 2),
+        }
+
+
+class DeadlineSkipped(Exception):
+    """
+    The auction ends before its price lookup could finish.
+    """
@@ -0,0 +1,151 @@
+import atexit
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from .metrics import span
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_PAGES = 50
+
+
+def default_chrome_options():
+    """
+    Headless Chrome options shared by every scraper.
+    """
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--log-level=3")
+    return options
+
+
+class _PooledDriver:
+    __slots__ = ("driver", "pages")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    """
+    Bounded pool of warm headless Chrome drivers.
+
+    Workers lease a driver with `with pool.lease() as driver:`. At most `size`
+    browsers exist at once; each one is recycled after `max_pages` page loads
+    or as soon as it stops answering a health check.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES, options_factory=default_chrome_options):
+        self.size = size
+        self.max_pages = max_pages
+        self._options_factory = options_factory
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.started = 0
+        self.recycled = 0
+
+    def _start_driver(self):
+        with span("chrome_start"):
+            driver = webdriver.Chrome(options=self._options_factory())
+        with self._lock:
+            self.started += 1
+        return _PooledDriver(driver)
+
+    @staticmethod
+    def _is_healthy(entry):
+        try:
+            entry.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        with self._lock:
+            self.recycled += 1
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            print("[DEBUG] Chrome driver quit error:", e)
+
+    def _checkout(self):
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except Empty:
+                return self._start_driver()
+            if self._is_healthy(entry):
+                return entry
+            self._discard(entry)
+
+    def _checkin(self, entry, failed):
+        entry.pages += 1
+        if self._closed or entry.pages >= self.max_pages or (failed and not self._is_healthy(entry)):
+            self._discard(entry)
+        else:
+            self._idle.put(entry)
+
+    @contextmanager
+    def lease(self):
+        if self._closed:
+            raise RuntimeError("Driver pool has been shut down")
+        with span("browser_lease"):
+            self._slots.acquire()
+        try:
+            entry = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        failed = False
+        try:
+            yield entry.driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._checkin(entry, failed)
+            self._slots.release()
+
+    def shutdown(self):
+        self._closed = True
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(entry)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def configure_driver_pool(size=None, max_pages=None):
+    """
+    Overrides the shared pool's settings. Call before the first lease.
+    """
+    global DEFAULT_POOL_SIZE, DEFAULT_MAX_PAGES
+    with _shared_pool_lock:
+        if size is not None:
+            DEFAULT_POOL_SIZE = size
+        if max_pages is not None:
+            DEFAULT_MAX_PAGES = max_pages
+
+
+def get_driver_pool():
+    """
+    Returns the process-wide driver pool, creating it on first use.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = DriverPool(DEFAULT_POOL_SIZE, DEFAULT_MAX_PAGES)
+            atexit.register(_shared_pool.shutdown)
+        return _shared_pool
@@ -0,0 +1,177 @@
+import base64
+import json
+import os
+import threading
+import time
+
+from . import config
+from .disk_cache import cache_file
+from .http_session import http_get, http_post
+from .metrics import count, span
+
+OAUTH_TOKEN_URL = f"{config.EBAY_API_BASE}/identity/v1/oauth2/token"
+TOKEN_FILE = "ebay_token.json"
+# A token is replaced this many seconds before eBay says it expires...
+EXPIRY_MARGIN = 120
+# ...and a background refresh starts this many seconds before that
+REFRESH_AHEAD = 600
+# After a failed background refresh, the next one waits this long (doubling per failure, up to the max)
+REFRESH_RETRY = 15
+REFRESH_RETRY_MAX = 120
+
+
+class EbayAuthError(Exception):
+    """
+    eBay refused to mint an application token (bad keys or scope).
+    """
+
+
+class EbayTokenManager:
+    """
+    Mints eBay application tokens with the OAuth client-credentials flow and
+    keeps them in memory and in the cache directory until shortly before they
+    expire (EXPIRY_MARGIN). A token getting close to expiry (REFRESH_AHEAD) is
+    replaced by a background refresh while the old one is still handed out,
+    so callers only wait for eBay on the very first mint.
+
+    Without a client ID and secret the pasted `config.EBAY_OAUTH_TOKEN` is used
+    as-is, like before.
+    """
+
+    def __init__(self, client_id, client_secret, scope=config.EBAY_OAUTH_SCOPE, path=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.path = path or cache_file(TOKEN_FILE)
+        self._access_token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refresh_failures = 0
+        self._next_refresh = 0.0
+        self.minted = 0
+
+    @property
+    def enabled(self):
+        return bool(self.client_id and self.client_secret)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        if stored.get("client_id") == self.client_id and stored.get("scope") == self.scope:
+            self._access_token = stored.get("access_token")
+            self._expires_at = float(stored.get("expires_at", 0))
+            count("ebay_token", result="disk")
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        # The token grants API access; keep it readable by this user only
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"client_id": self.client_id, "scope": self.scope,
+                       "access_token": self._access_token, "expires_at": self._expires_at}, f)
+        os.replace(tmp, self.path)
+
+    def _mint(self):
+        credentials = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+        with span("ebay_token_mint"):
+            r = http_post(OAUTH_TOKEN_URL, headers={
+                "Authorization": f"Basic {credentials}",
+                "Content-Type": "application/x-www-form-urlencoded",
+            }, data={"grant_type": "client_credentials", "scope": self.scope})
+        if r.status_code != 200:
+            raise EbayAuthError(f"eBay token request failed ({r.status_code}): {r.text[:200]}")
+        body = r.json()
+        return body["access_token"], time.time() + int(body.get("expires_in", 7200)) - EXPIRY_MARGIN
+
+    def _store(self, access_token, expires_at):
+        # Caller holds the lock
+        self._access_token = access_token
+        self._expires_at = expires_at
+        self.minted += 1
+        self._save()
+        count("ebay_token", result="minted")
+
+    def _refresh_in_background(self):
+        try:
+            token = self._mint()
+            with self._lock:
+                self._store(*token)
+                self._refresh_failures = 0
+        except Exception as e:
+            print("[DEBUG] eBay token refresh error:", e)
+            with self._lock:
+                # The current token is still valid; retry later instead of on every call
+                self._next_refresh = time.time() + min(REFRESH_RETRY * 2 ** self._refresh_failures,
+                                                       REFRESH_RETRY_MAX)
+                self._refresh_failures += 1
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def token(self):
+        """
+        Returns a valid access token, minting one if needed.
+        """
+        if not self.enabled:
+            return config.EBAY_OAUTH_TOKEN
+        with self._lock:
+            if self._access_token is None:
+                self._load()
+            remaining = self._expires_at - time.time()
+            if remaining > 0:
+                if remaining < REFRESH_AHEAD and not self._refreshing and time.time() >= self._next_refresh:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh_in_background, name="ebay-token", daemon=True).start()
+                return self._access_token
+            # Expired: mint under the lock so concurrent callers share one request
+            self._store(*self._mint())
+            return self._access_token
+
+    def invalidate(self, access_token):
+        """
+        Forgets `access_token` after eBay rejected it, unless it was already replaced.
+        """
+        with self._lock:
+            if self._access_token == access_token:
+                self._access_token = None
+                self._expires_at = 0.0
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_token_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = EbayTokenManager(config.EBAY_CLIENT_ID, config.EBAY_CLIENT_SECRET)
+        return _manager
+
+
+def ebay_get(url, params=None, token=None):
+    """
+    GETs a Browse API URL with a bearer token. Without an explicit `token` the
+    token manager supplies one, and a 401 (token revoked or expired early)
+    is retried once with a freshly minted token.
+    """
+    manager = get_token_manager()
+    for attempt in range(2):
+        access_token = token or manager.token()
+        r = http_get(url, params=params, headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        })
+        if r.status_code != 401 or token or not manager.enabled or attempt:
+            return r
+        count("ebay_auth_retries")
+        manager.invalidate(access_token)
+    return r
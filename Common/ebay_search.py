@@ -0,0 +1,214 @@
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse, parse_qs
+
+from . import config
+from .ebay_auth import ebay_get
+from .listing import iter_listings, parse_listing
+from .metrics import span
+
+BROWSE_SEARCH_URL = f"{config.EBAY_API_BASE}/buy/browse/v1/item_summary/search"
+BROWSE_LEGACY_ITEM_URL = f"{config.EBAY_API_BASE}/buy/browse/v1/item/get_item_by_legacy_id"
+BROWSE_ITEMS_URL = f"{config.EBAY_API_BASE}/buy/browse/v1/item/"
+MAX_PAGE_SIZE = 200
+# getItems accepts at most this many item IDs per request
+MAX_ITEMS_PER_BATCH = 20
+ITEM_URL_RE = re.compile(r"/itm/(?:[^/?#\s]+/)?(\d+)")
+# The Browse API refuses offsets past this point
+MAX_OFFSET = 10000
+
+
+def extract_item_ids(text):
+    """
+    Every distinct item ID in /itm/<id> URLs found in `text`, in order.
+    """
+    return list(dict.fromkeys(ITEM_URL_RE.findall(text)))
+
+
+def extract_input_type(text):
+    """
+    Returns ("url", item_id) for an eBay item URL, ("items", [item_id, ...])
+    for several pasted item URLs, ("keyword", text) for an eBay search URL or
+    plain keyword, or ("invalid", None).
+    """
+    text = text.strip()
+    if "ebay.com" in text:
+        item_ids = extract_item_ids(text)
+        if len(item_ids) > 1:
+            return "items", item_ids
+        match = re.search(r"/itm/(?:[^/?#]+/)?(\d+)", text)
+        if match:
+            return "url", match.group(1)
+        qs = parse_qs(urlparse(text).query)
+        keyword = qs.get("_nkw", [""])[0] or qs.get("nkw", [""])[0]
+        if keyword:
+            return "keyword", keyword
+        return "invalid", None
+    return "keyword", text
+
+
+def buying_option_filter(buying_option):
+    buying_option = buying_option.upper()
+    if buying_option == "AUCTION":
+        return "buyingOptions:{AUCTION}"
+    elif buying_option == "BUY NOW":
+        return "buyingOptions:{FIXED_PRICE}"
+    return ""
+
+
+def build_search_params(keyword, buying_option="AUCTION"):
+    params = {"q": keyword}
+    filter_str = buying_option_filter(buying_option)
+    if filter_str:
+        params["filter"] = filter_str
+    return params
+
+
+def fetch_search_page(params, token=None, offset=0, limit=MAX_PAGE_SIZE):
+    """
+    Fetches one page of Browse API search results. Without a `token` the
+    token manager in ebay_auth supplies (and renews) one.
+    """
+    page_params = dict(params, offset=offset, limit=limit)
+    with span("ebay_search_page"):
+        r = ebay_get(BROWSE_SEARCH_URL, page_params, token)
+        r.raise_for_status()
+        return r.json()
+
+
+def _take_items(page):
+    # Reversed so pop() hands items out in order and releases each one once
+    # the consumer is done with it, instead of holding the whole page
+    items = page.pop("itemSummaries", [])
+    items.reverse()
+    return items
+
+
+def iter_item_summaries(params, token=None, max_items=None, page_size=MAX_PAGE_SIZE, parallel_pages=1):
+    """
+    Yields item summaries page by page, following the Browse API offset pagination.
+
+    With `parallel_pages` > 1 up to that many pages are in flight at once and
+    items are yielded as each page arrives, so page order is not preserved.
+    At most `parallel_pages` pages are held in memory at any time.
+    """
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE, max_items or MAX_PAGE_SIZE))
+    first = fetch_search_page(params, token, 0, page_size)
+    total = min(first.get("total", 0), MAX_OFFSET)
+    if max_items is not None:
+        total = min(total, max_items)
+
+    has_next = "next" in first
+    items = _take_items(first)
+    del first
+
+    yielded = 0
+    while items:
+        if yielded >= total:
+            return
+        yield items.pop()
+        yielded += 1
+    if yielded >= total or not has_next:
+        return
+
+    offsets = iter(range(page_size, total, page_size))
+    workers = max(1, parallel_pages)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ebay-page")
+    pending = set()
+    try:
+        for offset in offsets:
+            pending.add(executor.submit(fetch_search_page, params, token, offset, page_size))
+            if len(pending) >= workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                items = _take_items(future.result())
+                while items:
+                    if yielded >= total:
+                        return
+                    yield items.pop()
+                    yielded += 1
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.add(executor.submit(fetch_search_page, params, token, offset, page_size))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_auctions(keyword, token=None, buying_option="AUCTION", max_items=None):
+    """
+    Streams compact Listing records for a keyword search.
+    """
+    params = build_search_params(keyword, buying_option)
+    return iter_listings(iter_item_summaries(params, token, max_items=max_items or config.MAX_RESULTS,
+                                             parallel_pages=config.PAGE_FETCH_WORKERS))
+
+
+def get_item_by_legacy_id(item_id, token=None):
+    """
+    Fetches one listing by the numeric ID shown in /itm/<id> URLs.
+    """
+    with span("ebay_get_item"):
+        r = ebay_get(BROWSE_LEGACY_ITEM_URL, {"legacy_item_id": item_id}, token)
+        r.raise_for_status()
+        return r.json()
+
+
+def fetch_items_batch(legacy_ids, token=None):
+    """
+    Fetches up to MAX_ITEMS_PER_BATCH listings in one getItems request.
+    IDs eBay cannot return (ended, or listings with variations) are left out.
+    """
+    item_ids = ",".join(f"v1|{legacy_id}|0" for legacy_id in legacy_ids)
+    with span("ebay_get_items"):
+        r = ebay_get(BROWSE_ITEMS_URL, {"item_ids": item_ids}, token)
+        if r.status_code == 404:
+            return []
+        r.raise_for_status()
+        items = r.json().get("items", [])
+    if len(items) < len(legacy_ids):
+        print(f"[DEBUG] getItems returned {len(items)} of {len(legacy_ids)} requested items")
+    return items
+
+
+def iter_items_by_ids(legacy_ids, token=None, parallel_batches=1):
+    """
+    Yields full item records for a list of legacy item IDs, fetched in
+    getItems batches of MAX_ITEMS_PER_BATCH with up to `parallel_batches`
+    batches in flight. Items are yielded as each batch arrives.
+    """
+    batches = iter([legacy_ids[i:i + MAX_ITEMS_PER_BATCH] for i in range(0, len(legacy_ids), MAX_ITEMS_PER_BATCH)])
+    workers = max(1, parallel_batches)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ebay-items")
+    pending = set()
+    try:
+        for batch in batches:
+            pending.add(executor.submit(fetch_items_batch, batch, token))
+            if len(pending) >= workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                items = future.result()
+                items.reverse()
+                while items:
+                    yield items.pop()
+                batch = next(batches, None)
+                if batch is not None:
+                    pending.add(executor.submit(fetch_items_batch, batch, token))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def search_listings(query):
+    """
+    Engine search stage. `query` is (mode, value, buying_option) as returned
+    by extract_input_type plus the buying option.
+    """
+    mode, value, buying_option = query
+    if mode == "items":
+        return iter_listings(iter_items_by_ids(value, parallel_batches=config.PAGE_FETCH_WORKERS))
+    if mode == "url":
+        return [parse_listing(get_item_by_legacy_id(value))]
+    return iter_auctions(value, buying_option=buying_option)
@@ -0,0 +1,128 @@
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import count, gauge, metrics
+from .rate_limit import THROTTLE_STATUSES, check_response, get_host_limiter, retry_after_seconds
+
+# (connect, read) seconds, used whenever a caller does not pass its own timeout
+DEFAULT_TIMEOUT = (5, 20)
+DEFAULT_POOL_SIZE = 10
+HOST_POOL_SIZES = {
+    "api.ebay.com": 16,
+    "serpapi.com": 8,
+    "www.pricecharting.com": 16,
+}
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_sessions = {}
+
+
+class CountingRetry(Retry):
+    """
+    urllib3 retry policy that also counts every retry per host and reports
+    429/503 responses to the host's rate limiter.
+    Backs off exponentially and honors Retry-After on 429/503.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        host = _pool.host if _pool is not None else "unknown"
+        count("http_retries", host=host)
+        if response is not None and response.status in THROTTLE_STATUSES:
+            # urllib3 retries these itself; the limiter still has to slow down
+            get_host_limiter(host).throttle(str(response.status), retry_after_seconds(response))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def default_retry():
+    return CountingRetry(
+        total=5,
+        connect=3,
+        read=2,
+        status=4,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that applies a default timeout to every request.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def get_session(host):
+    """
+    Returns the shared keep-alive session for an upstream host.
+    """
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            pool_size = HOST_POOL_SIZES.get(host, DEFAULT_POOL_SIZE)
+            adapter = TimeoutHTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=default_retry())
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def session_for(url):
+    return get_session(urlparse(url).hostname or "")
+
+
+def _export_connection_stats(host, session):
+    # urllib3 keeps running totals per pool; requests beyond the connections opened went over a reused one
+    requests_sent = connections = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_sent += pool.num_requests
+            connections += pool.num_connections
+    gauge("http_requests", requests_sent, host=host)
+    gauge("http_connections_opened", connections, host=host)
+    gauge("http_connections_reused", max(requests_sent - connections, 0), host=host)
+
+
+def _send(method, url, **kwargs):
+    # Every request waits for the host's token bucket and AIMD concurrency limit
+    host = urlparse(url).hostname or ""
+    session = get_session(host)
+    try:
+        with get_host_limiter(host).slot() as ticket:
+            r = session.request(method, url, **kwargs)
+            check_response(r, ticket)
+            return r
+    except requests.exceptions.Timeout as e:
+        metrics.count_timeout(e, host=host)
+        raise
+    finally:
+        _export_connection_stats(host, session)
+
+
+def http_get(url, **kwargs):
+    return _send("GET", url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    return _send("POST", url, **kwargs)
+
@@ -0,0 +1,59 @@
+from .profit import get_price
+
+
+class Listing:
+    """
+    The parts of an eBay item summary the comparison tools actually read.
+
+    A Browse API summary carries images, seller, categories, locations and
+    more; keeping whole summaries alive for a long scan holds a lot of JSON
+    nobody looks at. Summaries are parsed into these slotted records as they
+    arrive and the raw dict is dropped.
+
+    `price` is the current bid for auctions or the fixed price otherwise, and
+    `shipping` holds the cost (shipping + import charge) of every shipping
+    option, cheapest or not.
+    """
+    __slots__ = ("item_id", "title", "price", "shipping", "end_date", "url", "epid")
+
+    def __init__(self, item_id, title, price, shipping=(), end_date="", url="", epid=None):
+        self.item_id = item_id
+        self.title = title
+        self.price = price
+        self.shipping = shipping
+        self.end_date = end_date
+        self.url = url
+        self.epid = epid
+
+    @property
+    def min_shipping(self):
+        return min(self.shipping) if self.shipping else 0.0
+
+    @property
+    def total(self):
+        return self.price + self.min_shipping
+
+    def __repr__(self):
+        return f"Listing({self.item_id!r}, {self.title!r}, {self.price!r})"
+
+
+def parse_listing(summary):
+    """
+    Builds a Listing from a Browse API item summary (or getItem response).
+    """
+    costs = (get_price(opt.get("shippingCost")) + get_price(opt.get("importCharge"))
+             for opt in summary.get("shippingOptions", ()))
+    return Listing(
+        summary.get("itemId", ""),
+        summary.get("title", "Unknown"),
+        get_price(summary.get("currentBidPrice", summary.get("price"))),
+        tuple(cost for cost in costs if cost >= 0),
+        summary.get("itemEndDate", ""),
+        summary.get("itemWebUrl", ""),
+        summary.get("epid"),
+    )
+
+
+def iter_listings(summaries):
+    for summary in summaries:
+        yield parse_listing(summary)
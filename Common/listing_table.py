@@ -0,0 +1,218 @@
+from itertools import chain
+
+import numpy as np
+
+from .metrics import span
+from .profit import parse_price_text
+
+TAG_NAMES = np.array(["", "profit_positive", "profit_negative"])
+SORT_COLUMNS = ("bid", "shipping", "total", "market_price", "profit", "roi", "end_time")
+
+
+def money_text(value):
+    return "-" if np.isnan(value) else f"${value:.2f}"
+
+
+def percent_text(value):
+    return "-" if np.isnan(value) else f"{value:.0%}"
+
+
+def _end_time(date):
+    try:
+        return np.datetime64(date, "ms")
+    except ValueError:
+        return np.datetime64("NaT", "ms")
+
+
+def end_times(end_dates):
+    """
+    Auction end dates such as "2026-10-25T18:30:00.000Z" as epoch seconds (NaN if unknown).
+    """
+    dates = [date[:-1] if date.endswith("Z") else date or "NaT" for date in end_dates]
+    try:
+        ends = np.array(dates, dtype="datetime64[ms]")
+    except ValueError:
+        # One malformed date should not cost the rest of the batch their end times
+        ends = np.array([_end_time(date) for date in dates], dtype="datetime64[ms]")
+    return np.where(np.isnat(ends), np.nan, ends.astype(np.int64) / 1000.0)
+
+
+class ListingTable:
+    """
+    Columnar store of eBay listings for fast profit math over large result sets.
+
+    Each listing is one row; bid, cheapest shipping, total, market price,
+    profit, ROI and auction end time are NumPy float64 columns (NaN where
+    unknown). Market prices are parsed once when they arrive, and profit, ROI
+    and color tags are recomputed with vectorized operations, so re-sorting or
+    re-filtering never touches the raw JSON again.
+
+    The scraped price text and product link of each row are kept next to the
+    columns (`price_texts`, `links`, `priced`), so a view can draw any row
+    straight from the table.
+    """
+
+    def __init__(self, capacity=1024):
+        self.items = []
+        self.item_ids = []
+        self.titles = []
+        self.price_texts = []
+        self.links = []
+        self._rows = {}
+        self._size = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        self.bid = np.zeros(capacity)
+        self.shipping = np.zeros(capacity)
+        self.total = np.zeros(capacity)
+        self.market_price = np.full(capacity, np.nan)
+        self.profit = np.full(capacity, np.nan)
+        self.roi = np.full(capacity, np.nan)
+        self.end_time = np.full(capacity, np.nan)
+        self.tag = np.zeros(capacity, dtype=np.int8)
+        self.priced = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = {name: getattr(self, name) for name in SORT_COLUMNS + ("tag", "priced")}
+        self._alloc(capacity)
+        for name, column in old.items():
+            getattr(self, name)[:self._size] = column[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        # New lists and arrays rather than in-place resets, so a sort still
+        # running on a worker thread keeps reading the old rows
+        self.items = []
+        self.item_ids = []
+        self.titles = []
+        self.price_texts = []
+        self.links = []
+        self._rows = {}
+        self._size = 0
+        self._alloc(self.capacity)
+
+    def row_of(self, item_id):
+        return self._rows.get(item_id)
+
+    def add_items(self, items):
+        """
+        Appends eBay Listing records and returns the new row numbers.
+        Listings whose item_id is already in the table are skipped;
+        `items[row]` gives back the Listing of a row.
+        """
+        fresh = {}
+        for item in items:
+            item_id = item.item_id or str(id(item))
+            # Look up the existing index directly; copying it per batch made streaming quadratic
+            if item_id not in self._rows and item_id not in fresh:
+                fresh[item_id] = item
+        items = list(fresh.values())
+        if not items:
+            return np.arange(0)
+        start, count = self._size, len(items)
+        if start + count > self.capacity:
+            self._grow(start + count)
+        rows = np.arange(start, start + count)
+
+        bids = np.fromiter((item.price for item in items), dtype=np.float64, count=count)
+
+        # Flatten every shipping option, then take the per-row minimum in one pass
+        lengths = np.fromiter((len(item.shipping) for item in items), dtype=np.intp, count=count)
+        shipping = np.full(count, np.inf)
+        if lengths.any():
+            costs = np.fromiter(chain.from_iterable(item.shipping for item in items), dtype=np.float64)
+            np.minimum.at(shipping, np.repeat(np.arange(count), lengths), costs)
+        shipping[np.isinf(shipping)] = 0.0
+
+        self.bid[rows] = bids
+        self.shipping[rows] = shipping
+        self.total[rows] = bids + shipping
+        self.end_time[rows] = end_times([item.end_date for item in items])
+        for offset, (item_id, item) in enumerate(fresh.items()):
+            self._rows[item_id] = start + offset
+            self.items.append(item)
+            self.item_ids.append(item_id)
+            self.titles.append(item.title.lower())
+        self.price_texts.extend([None] * count)
+        self.links.extend([None] * count)
+        self._size += count
+        return rows
+
+    def set_market_prices(self, rows, price_texts, links=None):
+        """
+        Stores scraped price strings such as "$1,234.56" (and the product
+        links they came from) for the given rows and marks them as priced.
+        Each distinct string is parsed only once.
+        """
+        parsed = {}
+        values = np.empty(len(price_texts))
+        for i, text in enumerate(price_texts):
+            if text not in parsed:
+                price = parse_price_text(text) if isinstance(text, str) else None
+                parsed[text] = np.nan if price is None else price
+            values[i] = parsed[text]
+        rows = np.asarray(rows, dtype=np.intp)
+        self.market_price[rows] = values
+        self.priced[rows] = True
+        for i, row in enumerate(rows):
+            self.price_texts[row] = price_texts[i]
+            if links is not None:
+                self.links[row] = links[i]
+
+    def compute(self, rows=None):
+        """
+        Recomputes profit, ROI and profit tags for `rows` (default: every row).
+        """
+        with span("profit_pass"):
+            rows = np.arange(self._size) if rows is None else np.asarray(rows, dtype=np.intp)
+            total = self.total[rows]
+            profit = np.round(self.market_price[rows] - total, 2)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                roi = np.where(total > 0, profit / total, np.nan)
+            self.profit[rows] = profit
+            self.roi[rows] = roi
+            self.tag[rows] = np.select([profit > 0, profit < 0], [1, 2], 0)
+            return rows
+
+    def order(self, column, descending=True, rows=None):
+        """
+        Row numbers sorted by `column`; unknown (NaN) values always sort last.
+        """
+        rows = np.arange(self._size) if rows is None else np.asarray(rows, dtype=np.intp)
+        values = getattr(self, column)[rows]
+        keys = -values if descending else values
+        keys = np.where(np.isnan(keys), np.inf, keys)
+        return rows[np.argsort(keys, kind="stable")]
+
+    def matching(self, text, rows=None):
+        """
+        Row numbers whose title contains every word of `text` (any case).
+        """
+        rows = np.arange(self._size) if rows is None else np.asarray(rows, dtype=np.intp)
+        words = text.lower().split()
+        if not words:
+            return rows
+        titles = self.titles
+        return rows[np.fromiter((all(word in titles[row] for word in words) for row in rows),
+                                dtype=bool, count=len(rows))]
+
+    def view(self, count, column=None, descending=True, text=""):
+        """
+        The first `count` rows filtered by title `text` and sorted by `column`
+        (in arrival order without one). Only reads the table, so a view can
+        run on a worker thread while new rows keep arriving.
+        """
+        rows = np.arange(min(count, self._size))
+        if text:
+            rows = self.matching(text, rows)
+        if column:
+            rows = self.order(column, descending, rows)
+        return rows
+
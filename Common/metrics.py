@@ -0,0 +1,284 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from .disk_cache import cache_file
+
+# Histogram bucket upper bounds in seconds, shared by every stage
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+# Raw durations kept per stage for the run summary percentiles
+MAX_RUN_SAMPLES = 100000
+METRICS_PREFIX = "ebay_profit"
+PROMETHEUS_FILE = "metrics.prom"
+RUNS_DIR = "runs"
+# Stages whose p95 is shown in the GUI status line
+STATUS_STAGES = ("ebay_search_page", "resolve_url", "fetch_price", "profit_pass")
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    Process-wide stage timings and event counters.
+
+    `span(stage)` times a block into a per-stage histogram (and counts errors
+    and timeouts that escape it); `count(event, **labels)` bumps a counter and
+    `gauge(name, value, **labels)` sets a current value.
+    Histograms and counters are cumulative for the process and exported in
+    Prometheus text format; `start_run()`/`run_summary()` give the same
+    numbers for one search or scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = Counter()
+        self._gauges = {}
+        self._run_samples = {}
+        self._run_counters = Counter()
+        self.run_started = time.time()
+        self._local = threading.local()
+
+    def _capture(self, record):
+        records = getattr(self._local, "records", None)
+        if records is not None:
+            records.append(record)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+            samples = self._run_samples.setdefault(stage, [])
+            if len(samples) < MAX_RUN_SAMPLES:
+                samples.append(seconds)
+        self._capture(("observe", stage, seconds))
+
+    def count(self, event, amount=1, **labels):
+        key = (event, _labels(labels))
+        with self._lock:
+            self._counters[key] += amount
+            self._run_counters[key] += amount
+        self._capture(("count", event, amount, labels))
+
+    def gauge(self, name, value, **labels):
+        """
+        Sets a value that goes up and down, such as a current rate limit.
+        """
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = value
+
+    def count_timeout(self, error, **labels):
+        """
+        Counts `error` as a timeout if it is one (requests, urllib3, Selenium
+        and asyncio all name theirs "...Timeout..."). Only the first, innermost
+        caller counts a given exception, so nested spans do not add it up twice.
+        """
+        if "Timeout" not in type(error).__name__ or getattr(error, "_timeout_counted", False):
+            return
+        try:
+            error._timeout_counted = True
+        except AttributeError:
+            pass
+        self.count("timeouts", **labels)
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.count("errors", stage=stage)
+            self.count_timeout(e, stage=stage)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """
+        Decorator form of span().
+        """
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @contextmanager
+    def capture(self):
+        """
+        Collects the timings and counts this thread records inside the block
+        as a list of picklable records, so a worker process can send them to
+        its parent, which feeds them to replay().
+        """
+        records = []
+        self._local.records = records
+        try:
+            yield records
+        finally:
+            self._local.records = None
+
+    def replay(self, records):
+        for record in records:
+            if record[0] == "observe":
+                self.observe(record[1], record[2])
+            else:
+                self.count(record[1], record[2], **record[3])
+
+    def start_run(self):
+        with self._lock:
+            self._run_samples = {}
+            self._run_counters = Counter()
+            self.run_started = time.time()
+
+    def run_summary(self):
+        """
+        Stage percentiles and counters since the last start_run().
+        """
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._run_samples.items()}
+            counters = dict(self._run_counters)
+            gauges = dict(self._gauges)
+        stages = {}
+        for stage, ordered in sorted(samples.items()):
+            stages[stage] = {
+                "count": len(ordered),
+                "total_s": round(sum(ordered), 3),
+                **{f"p{pct}_s": round(_percentile(ordered, pct), 4) for pct in (50, 95, 99)},
+                "max_s": round(ordered[-1], 4),
+            }
+        return {
+            "started": self.run_started,
+            "duration_s": round(time.time() - self.run_started, 3),
+            "stages": stages,
+            "counters": {
+                event + _format_labels(labels): value for (event, labels), value in sorted(counters.items())
+            },
+            "gauges": {
+                name + _format_labels(labels): value for (name, labels), value in sorted(gauges.items())
+            },
+        }
+
+    def status_line(self):
+        """
+        One-line summary of the current run for the GUI status bar.
+        """
+        with self._lock:
+            samples = {stage: list(self._run_samples.get(stage, ())) for stage in STATUS_STAGES}
+            counters = list(self._run_counters.items())
+        parts = [f"{stage} p95 {_percentile(sorted(values), 95):.2f}s"
+                 for stage, values in samples.items() if values]
+        totals = Counter()
+        for (event, labels), value in counters:
+            labels = dict(labels)
+            if event.endswith("_cache") or event == "catalog":
+                if labels.get("result") != "error":
+                    totals["cache hits" if labels.get("result") in ("hit", "stale") else "cache misses"] += value
+            elif event in ("http_retries", "timeouts"):
+                totals[event.replace("http_", "")] += value
+            elif event == "throttle_events":
+                totals["throttled"] += value
+        parts += [f"{name} {int(value)}" for name, value in sorted(totals.items())]
+        return " · ".join(parts)
+
+    def prometheus_text(self):
+        with self._lock:
+            histograms = {stage: (list(h.counts), h.total, h.count) for stage, h in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        name = f"{METRICS_PREFIX}_stage_seconds"
+        lines = [f"# HELP {name} Time spent per pipeline stage.", f"# TYPE {name} histogram"]
+        for stage, (counts, total, count) in sorted(histograms.items()):
+            labels = (("stage", stage),)
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for event in sorted({event for event, _ in counters}):
+            counter = f"{METRICS_PREFIX}_{event}_total"
+            lines.append(f"# TYPE {counter} counter")
+            for (name_, labels), value in sorted(counters.items()):
+                if name_ == event:
+                    lines.append(f"{counter}{_format_labels(labels)} {value:g}")
+
+        for gauge_name in sorted({name_ for name_, _ in gauges}):
+            gauge = f"{METRICS_PREFIX}_{gauge_name}"
+            lines.append(f"# TYPE {gauge} gauge")
+            for (name_, labels), value in sorted(gauges.items()):
+                if name_ == gauge_name:
+                    lines.append(f"{gauge}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=None):
+        """
+        Writes the Prometheus text exposition (for node_exporter's textfile
+        collector or a scrape of the file), atomically.
+        """
+        path = path or cache_file(PROMETHEUS_FILE)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+        return path
+
+    def write_summary(self, path=None, **extra):
+        """
+        Writes the current run summary as JSON, by default to a timestamped
+        file under the cache directory's runs/ folder.
+        """
+        summary = dict(self.run_summary(), **extra)
+        if path is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(summary["started"]))
+            path = cache_file(os.path.join(RUNS_DIR, f"run-{stamp}.json"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, default=str)
+        return path
+
+
+metrics = Metrics()
+span = metrics.span
+count = metrics.count
+timed = metrics.timed
+gauge = metrics.gauge
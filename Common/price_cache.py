@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .disk_cache import DiskCache, cache_file
+from .metrics import count
+from .single_flight import SingleFlight
+
+# A price is fresh for PRICE_CACHE_TTL, then served stale (and refreshed in the
+# background) for another PRICE_CACHE_STALE_TTL before it has to be fetched again.
+PRICE_CACHE_TTL = 6 * 3600
+PRICE_CACHE_STALE_TTL = 24 * 3600
+PRICE_CACHE_NEGATIVE_TTL = 5 * 60
+PRICE_CACHE_MEMORY_ENTRIES = 10000
+PRICE_CACHE_DISK_ENTRIES = 100000
+PRICE_CACHE_FILE = "market_prices.sqlite3"
+
+
+class PriceCache:
+    """
+    Two-level (memory + disk) cache from (product URL, grade) to (price, fetched_at).
+    """
+
+    def __init__(self, disk, ttl=PRICE_CACHE_TTL, stale_ttl=PRICE_CACHE_STALE_TTL,
+                 negative_ttl=PRICE_CACHE_NEGATIVE_TTL, memory_entries=PRICE_CACHE_MEMORY_ENTRIES):
+        self.disk = disk
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._in_flight = SingleFlight()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="price-refresh")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(url, grade):
+        return f"{url}|{grade or ''}"
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        stored = self.disk.get(key)
+        if stored is None:
+            return None
+        entry = (stored[0], stored[1])
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _store(self, key, price):
+        entry = (price, time.time())
+        self._remember(key, entry)
+        ttl = self.ttl + self.stale_ttl if price is not None else self.negative_ttl
+        self.disk.set(key, list(entry), ttl=ttl)
+
+    def _refresh(self, key, fetch):
+        try:
+            price = fetch()
+            if price is not None:
+                self._store(key, price)
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print("[DEBUG] Background price refresh error:", e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_fetch(self, url, grade, fetch):
+        """
+        Returns the cached price for (url, grade), calling `fetch()` only on a miss.
+        A stale price is returned immediately while `fetch()` refreshes it in the background.
+        """
+        key = self._key(url, grade)
+        entry = self._lookup(key)
+        if entry is not None:
+            price, fetched_at = entry
+            age = time.time() - fetched_at
+            if price is None:
+                if age < self.negative_ttl:
+                    with self._lock:
+                        self.hits += 1
+                    count("price_cache", result="hit")
+                    return None
+            elif age < self.ttl:
+                with self._lock:
+                    self.hits += 1
+                count("price_cache", result="hit")
+                return price
+            elif age < self.ttl + self.stale_ttl:
+                with self._lock:
+                    self.stale_hits += 1
+                    start_refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                count("price_cache", result="stale")
+                if start_refresh:
+                    self._refresher.submit(self._refresh, key, fetch)
+                return price
+
+        with self._lock:
+            self.misses += 1
+        count("price_cache", result="miss")
+
+        def fetch_and_store():
+            price = fetch()
+            self._store(key, price)
+            return price
+
+        # Workers missing on the same product at once share one scrape
+        return self._in_flight.do(key, fetch_and_store)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self._in_flight.shared,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_price_cache():
+    """
+    Returns the process-wide market price cache, creating it on first use.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            disk = DiskCache(cache_file(PRICE_CACHE_FILE), PRICE_CACHE_TTL + PRICE_CACHE_STALE_TTL, PRICE_CACHE_DISK_ENTRIES)
+            _cache = PriceCache(disk)
+        return _cache
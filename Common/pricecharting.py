@@ -0,0 +1,172 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from . import config
+from .catalog import get_catalog
+from .compare_engine import ComparisonEngine
+from .driver_pool import get_driver_pool
+from .ebay_search import search_listings
+from .metrics import count, span, timed
+from .pricecharting_page import fetch_product_page, parse_product_page
+from .price_cache import get_price_cache
+from .profit import MONEY_RE
+from .providers import PriceProvider
+from .scrape_workers import browser_scrape
+from .serpapi_client import google_search
+from .title_analysis import analyze_title
+from .url_cache import cached_product_url, normalize_query
+
+
+def clean_title_for_search(title):
+    # First 1–3 name words before the grade, plus the grade itself
+    return analyze_title(title).search_query
+
+
+@timed("get_pricecharting_url")
+def get_pricecharting_url(title):
+    return cached_product_url("pricecharting", title, search_pricecharting_url)
+
+
+def search_pricecharting_url(title):
+    # SerpAPI and network errors propagate, so only a real "no match" gets cached as a miss
+    params = {
+        "engine": "google",
+        "q": f"{title} site:pricecharting.com",
+        "api_key": config.SERPAPI_KEY
+    }
+    results = google_search(params)
+    for result in results.get("organic_results", []):
+        link = result.get("link", "")
+        if "pricecharting.com" in link and "/product" in link:
+            return link
+    return None
+
+
+def find_price(texts):
+    for price_text in texts:
+        if "$" in price_text:
+            match = MONEY_RE.search(price_text)
+            if match:
+                return match.group(0)
+    return None
+
+
+@timed("scrape_pricecharting_price_from_url")
+def scrape_pricecharting_price_from_url(url):
+    # Fast path: the price cells are in the static HTML, no browser needed
+    page = fetch_product_page(url)
+    if page:
+        price = find_price(page.price_cells)
+        if price:
+            count("scrape_path", path="http", page="price")
+            return price
+    price = browser_scrape("pricecharting_price", url)
+    count("scrape_path", path="browser" if price else "failed", page="price")
+    return price
+
+
+def scrape_pricecharting_price_with_browser(url):
+    # Runs in a scrape worker process (see scrape_workers); errors propagate to browser_scrape
+    with get_driver_pool().lease() as driver:
+        with span("browser_get"):
+            driver.get(url)
+        with span("browser_wait"):
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "td.price"))
+            )
+        price_elements = driver.find_elements(By.CSS_SELECTOR, "td.price")
+        price = find_price(el.text.strip() for el in price_elements)
+        if price:
+            return price
+        text = driver.page_source
+        match = MONEY_RE.search(text)
+        if match:
+            return match.group(0)
+    return None
+
+
+# Price cache "grade" under which a product's whole grade -> price table is stored
+GRADE_TABLE = "*"
+
+
+@timed("scrape_grade_table")
+def scrape_grade_table(url):
+    """
+    Reads every row of a product's graded price table ("Ungraded", "Grade 9",
+    "PSA 10", "BGS 10", ...) in one page load. Returns {label: price} or None.
+    """
+    page = fetch_product_page(url)
+    if page and page.grade_rows:
+        count("scrape_path", path="http", page="grades")
+        return dict(page.grade_rows)
+
+    table = browser_scrape("pricecharting_grades", url)
+    count("scrape_path", path="browser" if table else "failed", page="grades")
+    return table
+
+
+def scrape_grade_table_with_browser(url):
+    # Runs in a scrape worker process; one wait for the table, then a plain HTML parse
+    with get_driver_pool().lease() as driver:
+        with span("browser_get"):
+            driver.get(url)
+        with span("browser_wait"):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table#graded_table, div.main-content, div.graded-prices"))
+            )
+        with span("page_parse"):
+            return parse_product_page(driver.page_source).grade_rows or None
+
+
+def get_grade_table(url):
+    """
+    The full grade -> price table of a product, scraped once and cached as one
+    price cache entry, so every grade of the same card is a dictionary lookup.
+    """
+    return get_price_cache().get_or_fetch(url, GRADE_TABLE, lambda: scrape_grade_table(url))
+
+
+def grade_price(table, grade_label):
+    """
+    Returns (price, row label) for a listing grade such as "PSA 9": the exact
+    row, then PriceCharting's generic "Grade 9" row, then "Ungraded".
+    Returns (None, "N/A") when the table has none of them.
+    """
+    candidates = [grade_label]
+    if " " in grade_label and grade_label != "Ungraded":
+        candidates.append("Grade " + grade_label.split(" ", 1)[1])
+    candidates.append("Ungraded")
+    for label in candidates:
+        price = (table or {}).get(label)
+        if price:
+            return price, label
+    return None, "N/A"
+
+
+def resolve_pricecharting_url(title):
+    # The local catalog answers well-known cards; SerpAPI only sees the rest
+    return get_catalog().resolve_url(title, "pricecharting",
+                                     lambda title: get_pricecharting_url(clean_title_for_search(title)))
+
+
+def lookup_pricecharting_price(url, title):
+    return get_price_cache().get_or_fetch(url, None, lambda: scrape_pricecharting_price_from_url(url))
+
+
+def get_pricecharting_price(title):
+    url = resolve_pricecharting_url(title)
+    if not url:
+        return (None, None)
+    price = lookup_pricecharting_price(url, title)
+    return (price, url)
+
+
+def create_provider():
+    return PriceProvider("pricecharting", "PriceCharting", resolve_pricecharting_url, lookup_pricecharting_price,
+                         resolve_key=lambda title: get_catalog().resolve_key(
+                             title, "pricecharting", lambda title: normalize_query(clean_title_for_search(title))))
+
+
+def create_engine(limits=None):
+    return ComparisonEngine(search_listings, [create_provider()], limits=limits)
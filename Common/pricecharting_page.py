@@ -0,0 +1,116 @@
+from html.parser import HTMLParser
+
+import requests
+
+from .http_session import http_get
+from .metrics import span
+
+PAGE_TIMEOUT = 10
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class ProductPage:
+    """
+    Prices parsed from the static HTML of a PriceCharting product page.
+
+    `price_cells` holds the text of every `td.price` cell in page order and
+    `grade_rows` maps a row label such as "Ungraded" or "PSA 10" to the first
+    price cell on that row.
+    """
+    __slots__ = ("price_cells", "grade_rows")
+
+    def __init__(self, price_cells, grade_rows):
+        self.price_cells = price_cells
+        self.grade_rows = grade_rows
+
+
+class _ProductPageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.price_cells = []
+        self.rows = []
+        self._row = None
+        self._cell = None
+        self._cell_is_price = False
+
+    def _close_cell(self):
+        text = " ".join("".join(self._cell).split())
+        if self._cell_is_price:
+            self.price_cells.append(text)
+        if self._row is not None:
+            self._row.append(text)
+        self._cell = None
+
+    def _close_row(self):
+        if self._cell is not None:
+            self._close_cell()
+        if self._row:
+            self.rows.append(self._row)
+        self._row = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._close_row()
+            self._row = []
+        elif tag in ("td", "th"):
+            if self._cell is not None:
+                self._close_cell()
+            classes = (dict(attrs).get("class") or "").split()
+            self._cell = []
+            self._cell_is_price = tag == "td" and "price" in classes
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None:
+            self._close_cell()
+        elif tag in ("tr", "table"):
+            self._close_row()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse_product_page(html):
+    """
+    Parses the price cells and the graded price table out of product page HTML.
+    """
+    parser = _ProductPageParser()
+    parser.feed(html)
+    parser.close()
+    parser._close_row()
+
+    grade_rows = {}
+    for row in parser.rows:
+        label = row[0]
+        if not label or "$" in label:
+            continue
+        price = next((cell for cell in row[1:] if "$" in cell), None)
+        if price:
+            grade_rows.setdefault(label, price)
+    return ProductPage(parser.price_cells, grade_rows)
+
+
+def fetch_product_page(url, timeout=PAGE_TIMEOUT):
+    """
+    Fetches a product page over plain HTTP and parses it.
+    Returns None when the page cannot be fetched or carries no prices,
+    so the caller can fall back to a real browser.
+    """
+    try:
+        with span("pricecharting_http"):
+            r = http_get(url, headers=BROWSER_HEADERS, timeout=timeout)
+            r.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print("[DEBUG] PriceCharting HTTP fetch error:", e)
+        return None
+    with span("page_parse"):
+        page = parse_product_page(r.text)
+    if not page.price_cells and not page.grade_rows:
+        return None
+    return page
+
@@ -0,0 +1,52 @@
+import re
+
+PRICE_TEXT_RE = re.compile(r"\$?\s*(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?")
+# A dollar amount as shown on a product page, thousands separators included ("$1,234.56")
+MONEY_RE = re.compile(r"\$(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d{2})?")
+
+
+def get_price(obj):
+    if obj and "value" in obj:
+        try:
+            return float(obj["value"])
+        except (ValueError, TypeError):
+            return 0.0
+    return 0.0
+
+
+def listing_costs(item):
+    """
+    Returns (bid, cheapest shipping, total) for an eBay Listing.
+    """
+    shipping = item.min_shipping
+    return item.price, shipping, item.price + shipping
+
+
+def parse_price_text(price_str):
+    """
+    Parses scraped text such as "$1,234.56" into a float, or None.
+    """
+    if not price_str or "$" not in price_str:
+        return None
+    match = PRICE_TEXT_RE.search(price_str)
+    if not match:
+        return None
+    return float(match.group(1).replace(",", "") + (match.group(2) or ""))
+
+
+def compute_profit(price_str, total):
+    market_price = parse_price_text(price_str)
+    if market_price is None:
+        return None
+    return round(market_price - total, 2)
+
+
+def profit_tag(profit):
+    """
+    Treeview tag used to color the profit column.
+    """
+    if profit is None or profit == 0:
+        return ""
+    elif profit > 0:
+        return "profit_positive"
+    return "profit_negative"
@@ -0,0 +1,55 @@
+import importlib
+
+from . import config
+from .compare_engine import ComparisonEngine
+from .ebay_search import search_listings
+
+# Price sources the tools know about -> (module, factory) returning a new PriceProvider.
+# A new source only needs a module with a factory and an entry here.
+PROVIDERS = {
+    "pricecharting": ("Common.pricecharting", "create_provider"),
+    "tcgplayer": ("Common.tcgplayer", "create_provider"),
+}
+
+
+class PriceProvider:
+    """
+    One market price source the engine can compare eBay listings against.
+
+      resolve_url(title)       -> product URL or None
+      fetch_price(url, title)  -> price (usually text such as "$12.34") or None
+
+    `label` is the name shown in column headings and `upstream` the engine
+    limit (see compare_engine.DEFAULT_LIMITS) its price fetches run under.
+    Listings with the same `resolve_key(title)` or `price_key(url, title)`
+    share one lookup, within this provider only.
+    """
+    __slots__ = ("name", "label", "upstream", "resolve_url", "fetch_price", "resolve_key", "price_key")
+
+    def __init__(self, name, label, resolve_url, fetch_price, upstream=None, resolve_key=None, price_key=None):
+        self.name = name
+        self.label = label
+        self.upstream = upstream or name
+        self.resolve_url = resolve_url
+        self.fetch_price = fetch_price
+        self.resolve_key = resolve_key or (lambda title: title)
+        self.price_key = price_key or (lambda url, title: url)
+
+    def __repr__(self):
+        return f"PriceProvider({self.name!r})"
+
+
+def create_provider(name):
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown price provider: {name}")
+    module, factory = PROVIDERS[name]
+    return getattr(importlib.import_module(module), factory)()
+
+
+def create_engine(names=None, limits=None):
+    """
+    An engine comparing every eBay listing against the providers in `names`
+    (default: config.PRICE_PROVIDERS) at the same time.
+    """
+    providers = [create_provider(name) for name in (names or config.PRICE_PROVIDERS)]
+    return ComparisonEngine(search_listings, providers, limits=limits)
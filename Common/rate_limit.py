@@ -0,0 +1,276 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from .metrics import count, gauge
+
+# Per-host limits: requests per second (None = no rate limit), burst size, and
+# the starting / smallest / largest number of requests allowed in flight
+HOST_RATE_LIMITS = {
+    "api.ebay.com": {"rate": 20, "burst": 20, "initial": 4, "min_limit": 1, "max_limit": 16},
+    "serpapi.com": {"rate": 10, "burst": 10, "initial": 4, "min_limit": 1, "max_limit": 8},
+    "www.pricecharting.com": {"rate": 5, "burst": 10, "initial": 4, "min_limit": 1, "max_limit": 16},
+    "www.tcgplayer.com": {"rate": 2, "burst": 4, "initial": 2, "min_limit": 1, "max_limit": 4},
+}
+DEFAULT_RATE_LIMIT = {"rate": None, "burst": 1, "initial": 8, "min_limit": 1, "max_limit": 32}
+
+# Statuses that mean "slow down" rather than "this request failed"
+THROTTLE_STATUSES = (429, 503)
+# Byte strings that only show up on bot-check pages
+CAPTCHA_MARKERS = (b"g-recaptcha", b"h-captcha", b"captcha-delivery", b"cf-chl-", b"/captcha/")
+# A throttle cuts concurrency and rate by this factor...
+DECREASE_FACTOR = 0.5
+# ...and further throttles within this many seconds count as the same event
+THROTTLE_COOLDOWN = 2.0
+# Concurrency only grows while latency stays below this multiple of the best seen
+LATENCY_TOLERANCE = 2.0
+# How fast the best-seen latency is allowed to drift up per request
+BASELINE_DRIFT = 0.01
+# Weight of the newest request in the running error rate, and the rate that stops growth
+ERROR_SMOOTHING = 0.1
+MAX_ERROR_RATE = 0.2
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `take()` reserves a token and returns how long
+    the caller has to sleep before using it, so waiters are served in order
+    and nobody spins on the lock.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self.rate is None:
+                return wait
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def pause(self, seconds):
+        """
+        Holds every caller back for `seconds` (a server's Retry-After).
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def set_rate(self, rate):
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+
+
+class Ticket:
+    """
+    Outcome of one request made through a HostLimiter slot. Requests count as
+    healthy unless marked `throttled` or `failed`.
+    """
+    __slots__ = ("reason", "retry_after", "ok")
+
+    def __init__(self):
+        self.reason = None
+        self.retry_after = None
+        self.ok = True
+
+    def throttled(self, reason, retry_after=None):
+        self.reason = reason
+        self.retry_after = retry_after
+        self.ok = False
+
+    def failed(self):
+        self.ok = False
+
+
+class HostLimiter:
+    """
+    Rate limit plus AIMD (additive increase, multiplicative decrease)
+    concurrency limit for one upstream host.
+
+    Every request takes a token from the bucket and a concurrency slot. Each
+    time a full window of `limit` requests succeeds with latency close to the
+    best seen and few errors, the limit grows by one and the rate by a tenth
+    of its configured value. A 429/503, CAPTCHA page or timeout halves both
+    (at most once per THROTTLE_COOLDOWN) and honors Retry-After.
+    """
+
+    def __init__(self, host, rate=None, burst=1, initial=8, min_limit=1, max_limit=32):
+        self.host = host
+        self.max_rate = rate
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(initial)
+        self.bucket = TokenBucket(rate, burst)
+        self.in_flight = 0
+        self.throttles = 0
+        self.baseline = None
+        self.error_rate = 0.0
+        self._successes = 0
+        self._last_throttle = -math.inf
+        self._cond = threading.Condition()
+        self._publish()
+
+    def _publish(self):
+        gauge("rate_limit_concurrency", int(self.limit), host=self.host)
+        if self.bucket.rate is not None:
+            gauge("rate_limit_rps", round(self.bucket.rate, 2), host=self.host)
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        wait = self.bucket.take()
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self, ticket, latency):
+        with self._cond:
+            self.in_flight -= 1
+            if ticket.reason is not None:
+                self._throttle(ticket.reason, ticket.retry_after)
+            else:
+                self._observe(ticket.ok, latency)
+            self._cond.notify_all()
+
+    def _observe(self, ok, latency):
+        self.error_rate = ERROR_SMOOTHING * (0.0 if ok else 1.0) + (1 - ERROR_SMOOTHING) * self.error_rate
+        if not ok:
+            self._successes = 0
+            return
+        self.baseline = latency if self.baseline is None else min(latency, self.baseline * (1 + BASELINE_DRIFT))
+        if latency > LATENCY_TOLERANCE * self.baseline or self.error_rate > MAX_ERROR_RATE:
+            self._successes = 0
+            return
+        self._successes += 1
+        if self._successes < int(self.limit):
+            return
+        self._successes = 0
+        changed = False
+        if self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1)
+            changed = True
+        if self.max_rate is not None and self.bucket.rate < self.max_rate:
+            self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.max_rate / 10))
+            changed = True
+        if changed:
+            self._publish()
+
+    def _throttle(self, reason, retry_after=None):
+        count("throttle_events", host=self.host, reason=reason)
+        if retry_after:
+            self.bucket.pause(retry_after)
+        now = time.monotonic()
+        if now - self._last_throttle < THROTTLE_COOLDOWN:
+            return
+        self._last_throttle = now
+        self.throttles += 1
+        self._successes = 0
+        self.limit = max(self.min_limit, math.floor(self.limit * DECREASE_FACTOR))
+        if self.bucket.rate is not None:
+            self.bucket.set_rate(max(self.max_rate / 20, self.bucket.rate * DECREASE_FACTOR))
+        self._publish()
+        print(f"[DEBUG] Throttled by {self.host} ({reason}); "
+              f"now {int(self.limit)} in flight, {self.bucket.rate or 'unlimited'} req/s")
+
+    def throttle(self, reason, retry_after=None):
+        """
+        Reports a throttle seen outside a slot (e.g. a 429 retried by urllib3).
+        """
+        with self._cond:
+            self._throttle(reason, retry_after)
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds a concurrency slot for one request and yields its Ticket.
+        Exceptions escaping the block count as failures, timeouts as throttles.
+        """
+        self.acquire()
+        ticket = Ticket()
+        started = time.monotonic()
+        try:
+            yield ticket
+        except Exception as e:
+            if "Timeout" in type(e).__name__:
+                ticket.throttled("timeout")
+            else:
+                ticket.failed()
+            raise
+        finally:
+            self.release(ticket, time.monotonic() - started)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "rate": round(self.bucket.rate, 2) if self.bucket.rate is not None else None,
+                "throttles": self.throttles,
+            }
+
+
+def retry_after_seconds(response):
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def check_response(response, ticket):
+    """
+    Marks the ticket throttled for 429/503 responses and CAPTCHA pages, and
+    failed for other server errors.
+    """
+    if response.status_code in THROTTLE_STATUSES:
+        ticket.throttled(str(response.status_code), retry_after_seconds(response))
+    elif response.status_code >= 500:
+        ticket.failed()
+    elif "html" in response.headers.get("Content-Type", "") and any(
+            marker in response.content for marker in CAPTCHA_MARKERS):
+        ticket.throttled("captcha")
+
+
+_lock = threading.Lock()
+_limiters = {}
+
+
+def get_host_limiter(host):
+    """
+    Returns the process-wide limiter for an upstream host.
+    """
+    with _lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter(host, **HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+        return limiter
+
+
+def host_slot(url):
+    """
+    Limiter slot for whatever host `url` points at, for requests that do not
+    go through http_session (e.g. browser page loads).
+    """
+    return get_host_limiter(urlparse(url).hostname or "").slot()
+
+
+def limiter_stats():
+    with _lock:
+        limiters = dict(_limiters)
+    return {host: limiter.stats() for host, limiter in limiters.items()}
@@ -0,0 +1,334 @@
+import atexit
+import importlib
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing.connection import wait
+
+from . import config
+from .metrics import count, metrics
+from .rate_limit import host_slot
+
+# Job kinds a worker understands -> (module, function) run in the worker process.
+# Requests are (job_id, kind, url) tuples, replies (job_id, value, error, records)
+# where error is None or (exception type name, message) and records are the
+# job's span timings and counts (see Metrics.capture), replayed in the parent.
+JOBS = {
+    "pricecharting_price": ("Common.pricecharting", "scrape_pricecharting_price_with_browser"),
+    "pricecharting_grades": ("Common.pricecharting", "scrape_grade_table_with_browser"),
+    "tcgplayer_price": ("Common.tcgplayer", "scrape_tcgplayer_price_with_browser"),
+}
+# How long a worker gets to quit its browser on shutdown before it is killed
+SHUTDOWN_GRACE = 5
+# How long past its job timeout a caller waits for a running job's result
+RESULT_GRACE = 10
+
+_in_worker = False
+
+
+class ScrapeWorkerError(Exception):
+    """
+    A browser scrape failed inside a worker process.
+    """
+
+
+class ScrapeTimeout(ScrapeWorkerError):
+    """
+    A browser scrape ran past its time limit; the worker was killed and replaced.
+    """
+
+
+class WorkerCrashed(ScrapeWorkerError):
+    """
+    The worker process died (e.g. chromedriver took it down) during a scrape.
+    """
+
+
+def run_job(kind, url):
+    module, name = JOBS[kind]
+    return getattr(importlib.import_module(module), name)(url)
+
+
+def _worker_main(conn):
+    global _in_worker
+    _in_worker = True
+    if hasattr(os, "setpgrp"):
+        # Chrome and chromedriver join this process group, so a kill takes them down too
+        os.setpgrp()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # A worker runs one job at a time, so it never needs more than one browser
+    from .driver_pool import configure_driver_pool
+    configure_driver_pool(size=1)
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+        job_id, kind, url = request
+        with metrics.capture() as records:
+            try:
+                value, error = run_job(kind, url), None
+            except Exception as e:
+                value, error = None, (type(e).__name__, str(e))
+        reply = (job_id, value, error, records)
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            break
+
+
+def _kill(process):
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    process.kill()
+    process.join(1)
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "job", "deadline")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.job = None
+        self.deadline = None
+
+
+class ScrapeWorkerPool:
+    """
+    Runs browser scrapes in separate worker processes, one Chrome each, so a
+    hung page load, a chromedriver crash or heavy HTML parsing never blocks or
+    takes down the calling process.
+
+    `submit(kind, url)` returns a Future that completes as soon as its worker
+    replies. A dispatcher thread hands jobs to idle workers over a pipe; a
+    worker that runs past `job_timeout` is killed together with its browser
+    (ScrapeTimeout) and one that dies is replaced (WorkerCrashed).
+    """
+
+    def __init__(self, size=None, job_timeout=None):
+        self.size = size or config.SCRAPE_WORKER_PROCESSES
+        self.job_timeout = job_timeout or config.SCRAPE_JOB_TIMEOUT
+        # spawn, not fork: the parent has Tk, Chrome and worker threads
+        self._context = multiprocessing.get_context("spawn")
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._wakeup_recv, self._wakeup_send = self._context.Pipe(duplex=False)
+        self._closed = False
+        self.completed = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self._workers = [self._spawn() for _ in range(self.size)]
+        self._thread = threading.Thread(target=self._run, name="scrape-dispatch", daemon=True)
+        self._thread.start()
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn,), daemon=True, name="scrape-worker")
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _replace(self, worker, error):
+        _kill(worker.process)
+        worker.conn.close()
+        if worker.job is not None:
+            future = worker.job[3]
+            if not future.done():
+                future.set_exception(error)
+        self._workers[self._workers.index(worker)] = self._spawn()
+
+    def submit(self, kind, url):
+        if kind not in JOBS:
+            raise ValueError(f"Unknown scrape job: {kind}")
+        if self._closed:
+            raise RuntimeError("Scrape worker pool has been shut down")
+        future = Future()
+        with self._lock:
+            self._pending.append((next(self._ids), kind, url, future))
+        self._wakeup_send.send_bytes(b"")
+        return future
+
+    def _dispatch(self):
+        for worker in self._workers:
+            if worker.job is not None:
+                continue
+            while True:
+                with self._lock:
+                    job = self._pending.popleft() if self._pending else None
+                if job is None:
+                    return
+                if job[3].set_running_or_notify_cancel():
+                    break
+            worker.job = job
+            worker.deadline = time.monotonic() + self.job_timeout
+            try:
+                worker.conn.send(job[:3])
+            except (EOFError, OSError):
+                self.crashes += 1
+                count("scrape_worker_restarts", reason="crash")
+                self._replace(worker, WorkerCrashed("scrape worker exited before the job started"))
+
+    def _receive(self, worker):
+        try:
+            job_id, value, error, records = worker.conn.recv()
+        except (EOFError, OSError):
+            self.crashes += 1
+            count("scrape_worker_restarts", reason="crash")
+            self._replace(worker, WorkerCrashed("scrape worker exited during the job"))
+            return
+        # Browser spans (chrome_start, browser_get, ...) were timed in the worker
+        metrics.replay(records)
+        job, worker.job, worker.deadline = worker.job, None, None
+        if job is None or job[0] != job_id:
+            return
+        self.completed += 1
+        if error is None:
+            job[3].set_result(value)
+        else:
+            name, message = error
+            cls = ScrapeTimeout if "Timeout" in name else ScrapeWorkerError
+            job[3].set_exception(cls(f"{name}: {message}"))
+
+    def _run(self):
+        try:
+            self._serve()
+        except Exception as e:
+            print("[DEBUG] Scrape worker dispatcher stopped:", e)
+            self._fail_all(WorkerCrashed(f"scrape worker dispatcher stopped: {e}"))
+
+    def _fail_all(self, error):
+        # Nothing will ever hand these jobs to a worker or read their replies
+        self._closed = True
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+        jobs = pending + [worker.job for worker in self._workers if worker.job is not None]
+        for job in jobs:
+            if not job[3].done():
+                job[3].set_exception(error)
+        for worker in self._workers:
+            _kill(worker.process)
+
+    def _serve(self):
+        while not self._closed:
+            self._dispatch()
+            deadlines = [worker.deadline for worker in self._workers if worker.deadline is not None]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            ready = wait([self._wakeup_recv] + [worker.conn for worker in self._workers], timeout)
+            for conn in ready:
+                if conn is self._wakeup_recv:
+                    while self._wakeup_recv.poll():
+                        self._wakeup_recv.recv_bytes()
+                    continue
+                worker = next((w for w in self._workers if w.conn is conn), None)
+                if worker is not None:
+                    self._receive(worker)
+            now = time.monotonic()
+            for worker in list(self._workers):
+                if worker.deadline is not None and now >= worker.deadline:
+                    self.timeouts += 1
+                    count("scrape_worker_restarts", reason="timeout")
+                    self._replace(worker, ScrapeTimeout(f"scrape took longer than {self.job_timeout}s"))
+
+    @property
+    def alive(self):
+        return not self._closed and self._thread.is_alive()
+
+    def result(self, future):
+        """
+        Waits for a submitted job. A queued job waits for a free worker; once
+        it runs, the caller gives up RESULT_GRACE seconds after its job
+        timeout, in case the dispatcher is stuck.
+        """
+        while True:
+            try:
+                return future.result(timeout=self.job_timeout + RESULT_GRACE)
+            except FutureTimeout:
+                if not self.alive:
+                    raise WorkerCrashed("scrape worker dispatcher is not running")
+                if future.running() and self._overdue(future):
+                    raise ScrapeTimeout(f"no result {RESULT_GRACE}s past the scrape's time limit")
+
+    def _overdue(self, future):
+        deadline = next((worker.deadline for worker in self._workers
+                         if worker.job is not None and worker.job[3] is future), None)
+        return deadline is None or time.monotonic() > deadline + RESULT_GRACE
+
+    def stats(self):
+        return {
+            "workers": self.size,
+            "busy": sum(1 for worker in self._workers if worker.job is not None),
+            "queued": len(self._pending),
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+        }
+
+    def shutdown(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup_send.send_bytes(b"")
+        self._thread.join(SHUTDOWN_GRACE)
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+        for job in pending:
+            job[3].cancel()
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (EOFError, OSError):
+                pass
+        for worker in self._workers:
+            worker.process.join(SHUTDOWN_GRACE)
+            if worker.process.is_alive():
+                _kill(worker.process)
+            if worker.job is not None and not worker.job[3].done():
+                worker.job[3].set_exception(WorkerCrashed("scrape worker pool shut down"))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_scrape_workers():
+    """
+    Returns the process-wide worker pool, or None when browser scrapes should
+    run in this process (SCRAPE_WORKER_PROCESSES = 0, or already in a worker).
+    """
+    global _pool
+    if _in_worker or not config.SCRAPE_WORKER_PROCESSES:
+        return None
+    with _pool_lock:
+        if _pool is None or not _pool.alive:
+            # A pool whose dispatcher died has failed its jobs; start over with a new one
+            _pool = ScrapeWorkerPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def browser_scrape(kind, url):
+    """
+    Runs a browser scrape job for `url` under the host's rate limiter, in a
+    worker process when the worker tier is enabled. Returns None on failure.
+    """
+    try:
+        with host_slot(url):
+            workers = get_scrape_workers()
+            if workers is None:
+                return run_job(kind, url)
+            return workers.result(workers.submit(kind, url))
+    except Exception as e:
+        print(f"[DEBUG] Browser scrape error ({kind}):", e)
+        return None
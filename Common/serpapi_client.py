@@ -0,0 +1,34 @@
+from . import config
+from .http_session import http_get
+from .metrics import span
+
+SERPAPI_SEARCH_URL = f"{config.SERPAPI_BASE}/search.json"
+# SerpAPI reports an empty result page through its "error" field; that one is a real answer
+NO_RESULTS_ERROR = "Google hasn't returned any results"
+
+
+class SerpApiError(Exception):
+    """
+    SerpAPI could not answer the search (bad key, quota, server error), as
+    opposed to answering that nothing matched.
+    """
+
+
+def google_search(params):
+    """
+    Runs a SerpAPI search over the shared session and returns the JSON result,
+    like `serpapi.GoogleSearch(params).get_dict()` does. Raises SerpApiError
+    when SerpAPI reports an error other than "no results".
+    """
+    with span("serpapi_search"):
+        r = http_get(SERPAPI_SEARCH_URL, params=params)
+        try:
+            results = r.json()
+        except ValueError:
+            raise SerpApiError(f"SerpAPI returned a non-JSON response ({r.status_code})")
+        error = results.get("error")
+        if error and NO_RESULTS_ERROR in error:
+            return results
+        if error or r.status_code >= 400:
+            raise SerpApiError(f"SerpAPI error ({r.status_code}): {error or r.text[:200]}")
+        return results
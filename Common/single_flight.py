@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs `fn`,
+    every caller that arrives while it is running waits for the same result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """
+    asyncio version of SingleFlight: concurrent awaits of the same key share one
+    task. The task is cancelled once every caller awaiting it was cancelled.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self.shared = 0
+
+    async def do(self, key, factory):
+        entry = self._tasks.get(key)
+        if entry is None:
+            # [task, callers still waiting]
+            entry = self._tasks[key] = [asyncio.ensure_future(factory()), 0]
+            entry[0].add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.shared += 1
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # shield: one cancelled waiter must not cancel the lookup for everyone else
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not task.done():
+                task.cancel()
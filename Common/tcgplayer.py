@@ -0,0 +1,91 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from . import config
+from .catalog import get_catalog
+from .compare_engine import ComparisonEngine
+from .driver_pool import get_driver_pool
+from .ebay_search import search_listings
+from .metrics import span, timed
+from .price_cache import get_price_cache
+from .profit import MONEY_RE
+from .providers import PriceProvider
+from .scrape_workers import browser_scrape
+from .serpapi_client import google_search
+from .url_cache import cached_product_url, normalize_query
+
+
+@timed("get_tcgplayer_url")
+def get_tcgplayer_url(title):
+    return cached_product_url("tcgplayer", title, search_tcgplayer_url)
+
+
+def resolve_tcgplayer_url(title):
+    # The local catalog answers well-known cards; SerpAPI only sees the rest
+    return get_catalog().resolve_url(title, "tcgplayer", get_tcgplayer_url)
+
+
+def search_tcgplayer_url(title):
+    # SerpAPI and network errors propagate, so only a real "no match" gets cached as a miss
+    params = {
+        "engine": "google",
+        "q": f"{title} site:tcgplayer.com",
+        "api_key": config.SERPAPI_KEY
+    }
+    results = google_search(params)
+    for result in results.get("organic_results", []):
+        link = result.get("link", "")
+        if "tcgplayer.com/product" in link:
+            return link
+    return None
+
+
+@timed("scrape_tcgplayer_price_from_url")
+def scrape_tcgplayer_price_from_url(url):
+    # TCGPlayer renders prices client-side, so every lookup needs a browser
+    return browser_scrape("tcgplayer_price", url)
+
+
+def scrape_tcgplayer_price_with_browser(url):
+    # Runs in a scrape worker process (see scrape_workers); errors propagate to browser_scrape
+    with get_driver_pool().lease() as driver:
+        with span("browser_get"):
+            driver.get(url)
+        with span("browser_wait"):
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "span[class*='price']"))
+            )
+        price_elements = driver.find_elements(By.CSS_SELECTOR, "span[class*='price']")
+        for el in price_elements:
+            price_text = el.text.strip()
+            if "$" in price_text and "Market" not in price_text:
+                match = MONEY_RE.search(price_text)
+                if match:
+                    return match.group(0)
+        text = driver.page_source
+        match = MONEY_RE.search(text)
+        if match:
+            return match.group(0)
+    return None
+
+
+def lookup_tcgplayer_price(url, title):
+    return get_price_cache().get_or_fetch(url, None, lambda: scrape_tcgplayer_price_from_url(url))
+
+
+def get_tcgplayer_price(title):
+    url = resolve_tcgplayer_url(title)
+    if not url:
+        return (None, None)
+    price = lookup_tcgplayer_price(url, title)
+    return (price, url)
+
+
+def create_provider():
+    return PriceProvider("tcgplayer", "TCGPlayer", resolve_tcgplayer_url, lookup_tcgplayer_price,
+                         resolve_key=lambda title: get_catalog().resolve_key(title, "tcgplayer", normalize_query))
+
+
+def create_engine(limits=None):
+    return ComparisonEngine(search_listings, [create_provider()], limits=limits)
@@ -0,0 +1,121 @@
+import re
+from functools import lru_cache
+
+# Grading companies seen in card titles; aliases map onto the short name
+GRADERS = ("PSA", "BGS", "CGC", "SGC", "TAG", "ACE", "HGA", "GMA", "ISA", "AGS", "CSG", "MNT", "PCA")
+GRADER_ALIASES = {"BECKETT": "BGS", "BVG": "BGS"}
+
+# Words that say nothing about which card it is
+NOISE_WORDS = frozenset((
+    "CARD", "CARDS", "TCG", "CCG", "NM", "MINT", "GEM", "MT", "NEAR", "LP", "MP", "HP", "DMG",
+    "ENGLISH", "ENG", "GRADED", "SLAB", "SLABBED", "FRESH", "AUTHENTIC", "GENUINE", "LOOK", "WOW",
+    "INVEST", "RARE", "NEW", "SEALED", "FREE", "SHIPPING", "LOT", "THE", "AND", "WITH", "FOR",
+    "UNGRADED", "RAW", "LOOSE", "PRISTINE", "BLACK", "LABEL",
+))
+
+TITLE_CACHE_SIZE = 65536
+
+_GRADER_PATTERN = "|".join(GRADERS + tuple(GRADER_ALIASES))
+# "PSA 10", "BGS9.5", "CGC-8", "PSA GEM MINT 10", "BGS PRISTINE 10"
+GRADE_RE = re.compile(
+    r"\b(" + _GRADER_PATTERN + r")\s*-?\s*"
+    r"(?:(?:GEM\s+MI?N?T|GEM\s+MT|MINT|MT|NM-MT|NM|PRISTINE|BLACK\s+LABEL)\s+)?"
+    r"(10|[1-9](?:\.5)?)(?![\d.])"
+)
+UNGRADED_RE = re.compile(r"\b(?:UNGRADED|RAW|LOOSE)\b")
+# "4/102", "TG05/TG30", "SV049/SV122", or "#025"
+SET_NUMBER_RE = re.compile(r"\b([A-Z]{0,4}\d{1,3}[A-Z]?)\s*/\s*([A-Z]{0,4}\d{1,3})\b|#\s?([A-Z]{0,4}\d{1,4})\b")
+TOKEN_RE = re.compile(r"\b[A-Z][A-Z0-9\-']{2,}\b")
+
+
+class TitleInfo:
+    """
+    Everything the price lookups need from one eBay listing title.
+
+    `grader`/`grade` are None for ungraded cards, `set_number` is the card
+    number as printed ("4/102", "025"), `name_tokens` are the words before the
+    grade that are not noise, and `noise` the noise words found anywhere in
+    the title.
+    """
+    __slots__ = ("title", "name_tokens", "grader", "grade", "set_number", "noise", "ungraded")
+
+    def __init__(self, title, name_tokens, grader, grade, set_number, noise, ungraded):
+        self.title = title
+        self.name_tokens = name_tokens
+        self.grader = grader
+        self.grade = grade
+        self.set_number = set_number
+        self.noise = noise
+        self.ungraded = ungraded
+
+    @property
+    def grade_label(self):
+        """
+        "PSA 10" style label, or "Ungraded".
+        """
+        return f"{self.grader} {self.grade}" if self.grader else "Ungraded"
+
+    @property
+    def search_query(self):
+        """
+        Short product search query: up to three name tokens plus the grade.
+        """
+        name = " ".join(self.name_tokens[:3])
+        return f"{name} {self.grade_label}".strip() if self.grader else name
+
+    def __repr__(self):
+        return f"TitleInfo({self.title!r}, {self.grade_label!r}, {self.name_tokens!r})"
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def analyze_title(title):
+    """
+    Parses a listing title in one pass over the uppercased text. Results are
+    memoized, so repeated titles (relists, refreshes, several providers) are
+    free after the first call.
+    """
+    text = title.upper()
+
+    grade_match = GRADE_RE.search(text)
+    grader = grade = None
+    name_end = len(text)
+    if grade_match:
+        grader = GRADER_ALIASES.get(grade_match.group(1), grade_match.group(1))
+        grade = grade_match.group(2)
+        name_end = grade_match.start()
+
+    set_number = None
+    set_match = SET_NUMBER_RE.search(text)
+    if set_match:
+        if set_match.group(1):
+            set_number = f"{set_match.group(1)}/{set_match.group(2)}"
+        else:
+            set_number = set_match.group(3)
+
+    name_tokens = []
+    noise = []
+    for match in TOKEN_RE.finditer(text):
+        token = match.group(0)
+        if token in NOISE_WORDS:
+            noise.append(token)
+        elif match.start() < name_end and token not in GRADERS and token not in GRADER_ALIASES:
+            name_tokens.append(token)
+
+    ungraded = grader is None and UNGRADED_RE.search(text) is not None
+    return TitleInfo(title, tuple(name_tokens), grader, grade, set_number, tuple(noise), ungraded)
+
+
+def analyze_titles(titles):
+    """
+    Batch form of analyze_title: returns one TitleInfo per title, in order.
+    Duplicate titles within the batch are parsed once.
+    """
+    parsed = {}
+    for title in titles:
+        if title not in parsed:
+            parsed[title] = analyze_title(title)
+    return [parsed[title] for title in titles]
+
+
+def clear_title_cache():
+    analyze_title.cache_clear()
@@ -0,0 +1,76 @@
+import threading
+
+from .disk_cache import DiskCache, cache_file
+from .metrics import count
+from .single_flight import SingleFlight
+
+# How long a resolved product URL is trusted, and how long a "no result" answer is kept
+URL_CACHE_TTL = 14 * 24 * 3600
+URL_CACHE_NEGATIVE_TTL = 12 * 3600
+URL_CACHE_MAX_ENTRIES = 50000
+URL_CACHE_FILE = "product_urls.sqlite3"
+
+_cache = None
+_cache_lock = threading.Lock()
+_in_flight = SingleFlight()
+
+
+def configure_url_cache(ttl=None, negative_ttl=None, max_entries=None, path=None):
+    """
+    Overrides the URL cache settings. Call before the first lookup.
+    """
+    global URL_CACHE_TTL, URL_CACHE_NEGATIVE_TTL, URL_CACHE_MAX_ENTRIES, URL_CACHE_FILE, _cache
+    with _cache_lock:
+        if ttl is not None:
+            URL_CACHE_TTL = ttl
+        if negative_ttl is not None:
+            URL_CACHE_NEGATIVE_TTL = negative_ttl
+        if max_entries is not None:
+            URL_CACHE_MAX_ENTRIES = max_entries
+        if path is not None:
+            URL_CACHE_FILE = path
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+
+
+def get_url_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(cache_file(URL_CACHE_FILE), URL_CACHE_TTL, URL_CACHE_MAX_ENTRIES)
+        return _cache
+
+
+def normalize_query(query):
+    return " ".join(query.upper().split())
+
+
+def cached_product_url(site, query, resolve):
+    """
+    Returns the product URL for `query` on `site`, calling `resolve(query)`
+    (a paid SerpAPI search) only when the cache has no fresh answer.
+
+    `resolve` returns None only when the search answered with no match; that
+    is cached for URL_CACHE_NEGATIVE_TTL. Errors it raises (timeouts, quota,
+    bad key) are passed on uncached, so the next lookup asks again.
+    """
+    cache = get_url_cache()
+    key = f"{site}|{normalize_query(query)}"
+    cached = cache.get(key)
+    if cached is not None:
+        count("url_cache", result="hit")
+        return cached or None
+    count("url_cache", result="miss")
+
+    def resolve_and_store():
+        try:
+            link = resolve(query)
+        except Exception:
+            count("url_cache", result="error")
+            raise
+        cache.set(key, link or "", ttl=None if link else URL_CACHE_NEGATIVE_TTL)
+        return link
+
+    # Threads asking for the same query at once share one SerpAPI call
+    return _in_flight.do(key, resolve_and_store)
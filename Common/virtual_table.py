@@ -0,0 +1,281 @@
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+POLL_MS = 50
+# Fallback sizes until the first drawn row can be measured
+ROW_HEIGHT = 20
+HEADING_HEIGHT = 24
+# Rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+SORT_ARROWS = {True: " ▼", False: " ▲"}
+
+
+class VirtualTable(tk.Frame):
+    """
+    A ttk.Treeview that only ever holds the rows that fit on screen.
+
+    The data lives in a backing model; the table keeps `rows`, the model's
+    row numbers in display order, and fills its few Treeview items ("slots")
+    from `row_cells(row) -> (values, tags)` for whatever part of `rows` is
+    scrolled into view. Scrolling, new data and price updates only redraw
+    those slots, so the widget costs the same at 50 rows or 50,000.
+
+    `order_rows(count, column, descending, text)` returns the display order
+    for the first `count` model rows, sorted by `column` and filtered by
+    `text`. While a sort or filter is active it runs on a worker thread and
+    the result is picked up by polling with `after()`, like BackgroundSearch;
+    changes arriving meanwhile are folded into one follow-up run.
+
+    `sort_columns` maps headings to the `column` passed to `order_rows`.
+    Clicking a heading sorts descending first (ascending for columns in
+    `ascending_columns`) and clicking it again flips the order. `on_rows()`
+    is called whenever a new display order has been applied.
+    """
+
+    def __init__(self, parent, columns, row_cells, order_rows, sort_columns=None, ascending_columns=(),
+                 on_rows=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.columns = tuple(columns)
+        self.row_cells = row_cells
+        self.order_rows = order_rows
+        self.sort_columns = dict(sort_columns or {})
+        self.ascending_columns = set(ascending_columns)
+        self.on_rows = on_rows
+        self.count = 0
+        self.rows = np.arange(0)
+        self.top = 0
+        self.sort_column = None
+        self.descending = True
+        self.filter_text = ""
+        self.selected_row = None
+        self._slots = []
+        self._visible = 1
+        self._row_height = ROW_HEIGHT
+        self._heading_height = HEADING_HEIGHT
+        self._generation = 0
+        self._ordering = False
+        self._dirty = False
+        self._draw_pending = False
+        self._ordered = queue.Queue()
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", selectmode="browse", height=1)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        for column in self.columns:
+            if column in self.sort_columns:
+                self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+            else:
+                self.tree.heading(column, text=column)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self._scroll_and_break(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda event: self._scroll_and_break(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self._scroll_and_break(-self._visible))
+        self.tree.bind("<Next>", lambda event: self._scroll_and_break(self._visible))
+        self.tree.bind("<Home>", lambda event: self._scroll_and_break(-len(self.rows)))
+        self.tree.bind("<End>", lambda event: self._scroll_and_break(len(self.rows)))
+
+    # --- Data -------------------------------------------------------------
+
+    @property
+    def shown(self):
+        return len(self.rows)
+
+    def reset(self):
+        """
+        Forgets every row, e.g. before a new search. Sorting and the filter stay.
+        """
+        self._generation += 1
+        self._dirty = False
+        self.count = 0
+        self.rows = np.arange(0)
+        self.top = 0
+        self.selected_row = None
+        self._draw()
+
+    def update_rows(self, count):
+        """
+        Tells the table the model now has `count` rows and that row contents
+        may have changed. Redraws right away and re-sorts/filters in the background.
+        """
+        self.count = count
+        if self.sort_column is None and not self.filter_text:
+            self.rows = np.arange(count)
+            self._schedule_draw()
+        else:
+            self._schedule_draw()
+            self._request_order()
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.descending = not self.descending
+        else:
+            self.descending = self.sort_columns[column] not in self.ascending_columns
+        self.sort_column = column
+        for heading in self.sort_columns:
+            arrow = SORT_ARROWS[self.descending] if heading == column else ""
+            self.tree.heading(heading, text=heading + arrow)
+        self._request_order()
+
+    def set_filter(self, text):
+        text = text.strip()
+        if text == self.filter_text:
+            return
+        self.filter_text = text
+        self.top = 0
+        self._request_order()
+
+    def _request_order(self):
+        self._dirty = True
+        if not self._ordering:
+            self._start_order()
+
+    def _start_order(self):
+        self._dirty = False
+        self._ordering = True
+        column = self.sort_columns.get(self.sort_column)
+        spec = (self._generation, self.count, column, self.descending, self.filter_text)
+        threading.Thread(target=self._order_worker, args=spec, daemon=True).start()
+        self.after(POLL_MS, self._poll_order)
+
+    def _order_worker(self, generation, count, column, descending, text):
+        try:
+            rows = self.order_rows(count, column, descending, text)
+        except Exception as e:
+            print("[DEBUG] Table sort/filter error:", e)
+            rows = None
+        self._ordered.put((generation, rows))
+
+    def _poll_order(self):
+        try:
+            generation, rows = self._ordered.get_nowait()
+        except queue.Empty:
+            self.after(POLL_MS, self._poll_order)
+            return
+        self._ordering = False
+        if rows is not None and generation == self._generation:
+            self.rows = rows
+            self._draw()
+            if self.on_rows:
+                self.on_rows()
+        if self._dirty:
+            self._start_order()
+
+    # --- Drawing ----------------------------------------------------------
+
+    def _schedule_draw(self):
+        # Several updates within one Tk idle cycle share one redraw
+        if not self._draw_pending:
+            self._draw_pending = True
+            self.after_idle(self._draw)
+
+    def _set_slot_count(self, needed):
+        while len(self._slots) < needed:
+            slot = f"slot{len(self._slots)}"
+            self.tree.insert("", tk.END, iid=slot, values=())
+            self._slots.append(slot)
+        while len(self._slots) > needed:
+            self.tree.delete(self._slots.pop())
+
+    def _draw(self):
+        self._draw_pending = False
+        total = len(self.rows)
+        self.top = max(0, min(self.top, total - self._visible))
+        shown = self.rows[self.top:self.top + self._visible]
+        self._set_slot_count(len(shown))
+        selected_slot = None
+        for slot, row in zip(self._slots, shown):
+            values, tags = self.row_cells(int(row))
+            self.tree.item(slot, values=values, tags=tags)
+            if row == self.selected_row:
+                selected_slot = slot
+        if selected_slot is not None:
+            if self.tree.selection() != (selected_slot,):
+                self.tree.selection_set(selected_slot)
+            self.tree.focus(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + len(shown)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self._measure()
+
+    def _measure(self):
+        # Real row and heading heights depend on the theme and font; learn them from a drawn row
+        if not self._slots:
+            return
+        box = self.tree.bbox(self._slots[0])
+        if box and (box[1], box[3]) != (self._heading_height, self._row_height) and box[3] > 0:
+            self._heading_height, self._row_height = box[1], box[3]
+            self._on_resize()
+
+    def _on_resize(self, event=None):
+        height = self.tree.winfo_height()
+        visible = max(1, (height - self._heading_height) // self._row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._schedule_draw()
+
+    # --- Scrolling and selection -------------------------------------------
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), len(self.rows) - self._visible))
+        if top != self.top:
+            self.top = top
+            self._schedule_draw()
+
+    def _scroll_and_break(self, delta):
+        self.scroll_to(self.top + delta)
+        return "break"
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_and_break(-notches * WHEEL_ROWS)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.rows)))
+        elif action == "scroll":
+            step = self._visible if unit == "pages" else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        index = self.top + self._slots.index(selection[0])
+        if index < len(self.rows):
+            self.selected_row = int(self.rows[index])
+
+    def _move_selection(self, step):
+        if not len(self.rows):
+            return "break"
+        positions = np.flatnonzero(self.rows == self.selected_row) if self.selected_row is not None else ()
+        index = positions[0] + step if len(positions) else self.top
+        index = max(0, min(index, len(self.rows) - 1))
+        self.selected_row = int(self.rows[index])
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self._visible:
+            self.top = index - self._visible + 1
+        self._schedule_draw()
+        return "break"
+
+    def selected_cells(self):
+        """
+        The values of the selected row, or None.
+        """
+        if self.selected_row is None or self.selected_row >= self.count:
+            return None
+        return self.row_cells(self.selected_row)[0]
@@ -0,0 +1,61 @@
+def fingerprint(listing):
+    """
+    What has to change for a listing to be compared again.
+    """
+    return listing.price, listing.shipping
+
+
+def result_signature(result):
+    """
+    What has to change for a result to be reported again: the listing's
+    price and shipping (and so its profit), plus every quote's price, link
+    and whether it failed.
+    """
+    quotes = result.quotes.values() if result.quotes else (result,)
+    return fingerprint(result.item), tuple((quote.price, quote.link, quote.error is not None) for quote in quotes)
+
+
+class Watchlist:
+    """
+    Remembers the last comparison of every watched eBay listing, so repeated
+    polls of the same queries only look up what changed.
+
+    Pass `known` to ComparisonEngine.compare and feed every result to
+    `record`: listings whose price and shipping are unchanged reuse their
+    stored result, and `record` reports whether a result is "new", "changed"
+    or unchanged (None). Results are compared by content, so the same
+    listing turning up in overlapping queries is reported once. `prune`
+    forgets listings that no longer show up.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def known(self, listing):
+        entry = self._entries.get(listing.item_id)
+        # Failed lookups are retried on the next poll
+        if entry is not None and entry[0] == fingerprint(listing) and not entry[1].error:
+            return entry[1]
+        return None
+
+    def record(self, result):
+        listing = result.item
+        signature = result_signature(result)
+        entry = self._entries.get(listing.item_id)
+        self._entries[listing.item_id] = (fingerprint(listing), result, signature)
+        if entry is None:
+            return "new"
+        return "changed" if entry[2] != signature else None
+
+    def prune(self, active_ids):
+        """
+        Drops listings not in `active_ids` (ended, sold or no longer matching)
+        and returns their item IDs.
+        """
+        gone = [item_id for item_id in self._entries if item_id not in active_ids]
+        for item_id in gone:
+            del self._entries[item_id]
+        return gone
@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common import config
+from Common.ebay_search import extract_input_type
+from Common.metrics import metrics, span
+from Common.price_cache import get_price_cache
+from Common.profit import listing_costs, compute_profit
+from Common.providers import PROVIDERS, create_engine
+from Common.watchlist import Watchlist
+
+FIELDS = ("query", "item_id", "title", "bid", "shipping", "total", "end_date",
+          "ebay_url", "market_price", "market_link", "profit", "error")
+# Watch mode adds whether a listing is "new" or "changed" since the last poll
+WATCH_FIELDS = FIELDS + ("change",)
+# With several sources every record also gets <source>_price, _link and _profit
+SOURCE_FIELDS = ("price", "link", "profit")
+
+
+def record_fields(sources, watch=False):
+    fields = WATCH_FIELDS if watch else FIELDS
+    if len(sources) > 1:
+        fields += tuple(f"{source}_{field}" for source in sources for field in SOURCE_FIELDS)
+    return fields
+
+
+def read_queries(stream):
+    """
+    Yields one keyword or eBay URL per non-empty line, skipping # comments.
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def to_record(query, result):
+    item = result.item
+    bid, shipping, total = listing_costs(item)
+    with span("profit_pass"):
+        profit = compute_profit(result.price, total)
+        sources = {}
+        if len(result.quotes) > 1:
+            for source, quote in result.quotes.items():
+                sources[f"{source}_price"] = quote.price or ""
+                sources[f"{source}_link"] = quote.link or ""
+                sources[f"{source}_profit"] = compute_profit(quote.price, total)
+    return {
+        "query": query,
+        "item_id": item.item_id,
+        "title": item.title,
+        "bid": round(bid, 2),
+        "shipping": round(shipping, 2),
+        "total": round(total, 2),
+        "end_date": item.end_date,
+        "ebay_url": item.url,
+        "market_price": result.price or "",
+        "market_link": result.link or "",
+        "profit": profit,
+        "error": str(result.error) if result.error else "",
+        **sources,
+    }
+
+
+class RecordWriter:
+    """
+    Writes one CSV row or JSON line per listing and flushes it immediately,
+    so partial results survive an interrupted scan.
+    """
+
+    def __init__(self, stream, fmt, fields=FIELDS):
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=fields)
+            self._csv.writeheader()
+            stream.flush()
+
+    def write(self, record):
+        if self.fmt == "csv":
+            self._csv.writerow(record)
+        else:
+            self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+        self.count += 1
+
+
+async def scan(engine, queries, buying_option, writer, concurrent_queries, watchlist=None, seen=None):
+    limit = asyncio.Semaphore(concurrent_queries)
+
+    def on_result(line, result):
+        if watchlist is None:
+            writer.write(to_record(line, result))
+            return
+        change = watchlist.record(result)
+        if change:
+            writer.write(dict(to_record(line, result), change=change))
+
+    async def run_query(line, query):
+        async with limit:
+            try:
+                # Batched item URLs are reported under each listing's own URL
+                await engine.compare(query,
+                                     on_result=lambda result: on_result(line or result.item.url, result),
+                                     on_listing=seen.add if seen is not None else None,
+                                     known=watchlist.known if watchlist is not None else None)
+            except Exception as e:
+                print(f"[DEBUG] Scan failed for '{line or 'item URLs'}': {e}", file=sys.stderr)
+
+    runs = []
+    item_ids = []
+    for line in queries:
+        mode, value = extract_input_type(line)
+        if mode == "invalid":
+            print(f"[DEBUG] Skipping invalid input: '{line}'", file=sys.stderr)
+        elif mode == "url":
+            item_ids.append(value)
+        elif mode == "items":
+            item_ids.extend(value)
+        else:
+            runs.append(run_query(line, (mode, value, buying_option)))
+    if item_ids:
+        # Item URLs from every line share getItems requests of up to 20 listings
+        runs.append(run_query(None, ("items", list(dict.fromkeys(item_ids)), buying_option)))
+    await asyncio.gather(*runs)
+
+
+async def watch(engine, queries, buying_option, writer, concurrent_queries, interval, rounds=None, metrics_file=None):
+    """
+    Re-runs the queries every `interval` seconds. Only new listings and
+    listings whose price or shipping changed are looked up and written; the
+    rest reuse their previous result. Metrics are exported after every round.
+    """
+    watchlist = Watchlist()
+    round_number = 0
+    while rounds is None or round_number < rounds:
+        round_number += 1
+        started = time.monotonic()
+        written = writer.count
+        listings = set()
+        await scan(engine, queries, buying_option, writer, concurrent_queries, watchlist, listings)
+        gone = watchlist.prune({listing.item_id for listing in listings})
+        print(f"[DEBUG] Round {round_number}: {len(listings)} listings, {writer.count - written} new or changed, "
+              f"{len(gone)} gone, {time.monotonic() - started:.1f}s", file=sys.stderr)
+        metrics.write_prometheus(metrics_file)
+        if rounds is None or round_number < rounds:
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare eBay listings against market prices without the GUI.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file with one keyword or eBay URL per line (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("-f", "--format", choices=("csv", "jsonl"),
+                        help="output format (default: from the output extension, else jsonl)")
+    parser.add_argument("-s", "--source", action="append", choices=sorted(PROVIDERS) + ["all"],
+                        help="market price source; repeat it (or use 'all') to compare every listing "
+                             "against several sources at once (default: pricecharting)")
+    parser.add_argument("-b", "--buying-option", choices=("Auction", "Buy Now", "All"), default="Auction")
+    parser.add_argument("-c", "--concurrent-queries", type=int, default=4,
+                        help="how many queries are searched at once")
+    parser.add_argument("-n", "--max-results", type=int, default=config.MAX_RESULTS,
+                        help=f"eBay results loaded per query (default {config.MAX_RESULTS}, at most 10000)")
+    parser.add_argument("-w", "--watch", type=float, metavar="SECONDS",
+                        help="keep polling the queries every SECONDS and only output new or changed listings")
+    parser.add_argument("--rounds", type=int, help="stop watching after this many polls (default: run until stopped)")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="write Prometheus text-format metrics here (default: metrics.prom in the cache directory)")
+    parser.add_argument("--summary-json", metavar="PATH",
+                        help="write the per-run JSON summary here (default: runs/ in the cache directory)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fmt = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+    config.MAX_RESULTS = args.max_results
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    sources = args.source or ["pricecharting"]
+    if "all" in sources:
+        sources = list(config.PRICE_PROVIDERS)
+    sources = list(dict.fromkeys(sources))
+    engine = create_engine(sources)
+    try:
+        queries = list(read_queries(source))
+        if args.watch:
+            writer = RecordWriter(output, fmt, record_fields(sources, watch=True))
+            try:
+                asyncio.run(watch(engine, queries, args.buying_option, writer, args.concurrent_queries,
+                                  args.watch, args.rounds, args.metrics_file))
+            except KeyboardInterrupt:
+                pass
+        else:
+            writer = RecordWriter(output, fmt, record_fields(sources))
+            asyncio.run(scan(engine, queries, args.buying_option, writer, args.concurrent_queries))
+        print(f"[DEBUG] {len(queries)} queries, {writer.count} listings written", file=sys.stderr)
+        print("[DEBUG] Price cache:", get_price_cache().stats(), file=sys.stderr)
+        print("[DEBUG] Engine:", engine.stats(), file=sys.stderr)
+        print("[DEBUG] Metrics:", metrics.write_prometheus(args.metrics_file),
+              metrics.write_summary(args.summary_json, queries=len(queries), listings=writer.count), file=sys.stderr)
+    finally:
+        engine.shutdown()
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,30 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import requests
-from urllib.parse import quote_plus
-from serpapi import GoogleSearch
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import re
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import webbrowser
+import os
 import sys
 
-# --- API Keys and Tokens ---
-# IMPORTANT: Replace this with your actual, fresh eBay OAuth token.
-# eBay OAuth tokens have a limited lifespan and will expire.
-# You need to generate a new one from your eBay Developer Account.
-EBAY_OAUTH_TOKEN = r"""PUT EBAY OAUTH TOKEN HERE"""
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common import config
+from Common.background_search import BackgroundSearch
+from Common.catalog import get_catalog
+from Common.compare_engine import ComparisonEngine
+from Common.ebay_search import build_search_params, iter_item_summaries
+from Common.listing import iter_listings
+from Common.metrics import metrics, timed
+from Common.pricecharting import get_grade_table, grade_price
+from Common.price_cache import get_price_cache
+from Common.providers import PriceProvider
+from Common.serpapi_client import google_search
+from Common.title_analysis import analyze_title
+from Common.url_cache import cached_product_url, normalize_query
 
-# Your SerpAPI Key
-SERPAPI_KEY = "PUT SERP API KEY HERE"
+# --- API Keys and Tokens ---
+# eBay tokens come from the shared token manager: set EBAY_CLIENT_ID and
+# EBAY_CLIENT_SECRET (or paste a token) in Common/config.py, where the
+# SerpAPI key (SERPAPI_KEY) is set too.
 
 # --- Helper Functions ---
 
@@ -40,48 +43,15 @@ def extract_input_type(text):
     else:
         return "keyword", text
 
-def search_auctions(keyword, token, buying_option="AUCTION"):
-    """
-    Searches eBay for items based on a keyword and buying option.
-    """
-    buying_option = buying_option.upper()
-    filter_str = ""
-    if buying_option == "AUCTION":
-        filter_str = "buyingOptions:{AUCTION}"
-    elif buying_option == "BUY NOW":
-        filter_str = "buyingOptions:{FIXED_PRICE}"
-
-    url = f"https://api.ebay.com/buy/browse/v1/item_summary/search?q={quote_plus(keyword)}"
-    if filter_str:
-        url += f"&filter={filter_str}"
-    url += "&limit=10"
-
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    print(f"Making eBay API request to: {url}")
-    try:
-        r = requests.get(url, headers=headers)
-        r.raise_for_status()
-        print(f"eBay API response status: {r.status_code}")
-        return r.json().get("itemSummaries", [])
-    except requests.exceptions.RequestException as e:
-        print(f"eBay API request failed: {e}", file=sys.stderr)
-        messagebox.showerror("API Error", f"Failed to connect to eBay API or request failed: {e}\n\n"
-                                          f"If it's a 401 error, your eBay token might be expired or invalid.")
-        return []
-
-def get_price(obj):
+def search_listings(query):
     """
-    Safely extracts price value from a dictionary.
+    Streams compact eBay Listing records for a (keyword, buying option) query.
     """
-    if obj and "value" in obj:
-        try:
-            return float(obj["value"])
-        except (ValueError, TypeError):
-            return 0.0
-    return 0.0
+    keyword, buying_option = query
+    params = build_search_params(keyword, buying_option)
+    print(f"Making eBay API requests for: {params}")
+    return iter_listings(iter_item_summaries(params, max_items=config.MAX_RESULTS,
+                                             parallel_pages=config.PAGE_FETCH_WORKERS))
 
 def format_time_left(end_time):
     """
@@ -103,118 +73,50 @@ def extract_grade_from_title(title):
     Extracts grading information (e.g., PSA 10, CGC 9.5) from an item title.
     Defaults to "Ungraded" if no specific grade is found.
     """
-    grade_match = re.search(r'(PSA|CGC|BGS)\s*(\d+(\.\d+)?)', title, re.IGNORECASE)
-    if grade_match:
-        return f"{grade_match.group(1).upper()} {grade_match.group(2)}"
-    elif re.search(r'ungraded|raw|loose', title, re.IGNORECASE):
-        return "Ungraded"
-    return "Ungraded"
+    return analyze_title(title).grade_label
 
+@timed("get_pricecharting_url")
 def get_pricecharting_url(title):
+    """
+    Returns the PriceCharting.com URL for the given title: from the local catalog when it
+    has a confident match, else from the URL cache or SerpAPI.
+    """
+    return get_catalog().resolve_url(
+        title, "pricecharting",
+        lambda title: cached_product_url("pricecharting-pokemon", title, search_pricecharting_url))
+
+def search_pricecharting_url(title):
     """
     Uses SerpAPI to find a relevant PriceCharting.com URL for the given title.
     """
     params = {
         "engine": "google",
         "q": f"{title} pricecharting.com pokemon",
-        "api_key": SERPAPI_KEY
+        "api_key": config.SERPAPI_KEY
     }
     print(f"Searching SerpAPI for PriceCharting URL with query: '{params['q']}'")
-    try:
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        if "error" in results:
-            print(f"SerpAPI Error: {results['error']}", file=sys.stderr)
-            return None
-
-        for result in results.get("organic_results", []):
-            link = result.get("link", "")
-            if "pricecharting.com/game/pokemon" in link:
-                print(f"Found PriceCharting URL: {link}")
-                return link
-        print("No relevant PriceCharting URL found in SerpAPI results.")
-    except Exception as e:
-        print(f"[DEBUG] SerpAPI error for PriceCharting URL: {e}", file=sys.stderr)
+    # SerpAPI errors raise (and are not cached); only "nothing relevant found" returns None
+    results = google_search(params)
+    for result in results.get("organic_results", []):
+        link = result.get("link", "")
+        if "pricecharting.com/game/pokemon" in link:
+            print(f"Found PriceCharting URL: {link}")
+            return link
+    print("No relevant PriceCharting URL found in SerpAPI results.")
     return None
 
+@timed("scrape_pricecharting_price_from_url")
 def scrape_pricecharting_price_from_url(url, grade_to_find):
     """
-    Scrapes the price for a specific grade from a PriceCharting.com URL using Selenium.
-    Includes a fallback to "Ungraded" price if the specific grade is not found.
+    Looks up the price for a specific grade on a PriceCharting.com URL.
+    The product's whole graded price table is scraped once (static HTML first,
+    Chrome only when that fails) and cached, so other grades of the same card
+    are dictionary lookups. Falls back to the "Grade N" row and then "Ungraded".
     Returns the price string and the actual grade key found on PriceCharting.
     """
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--log-level=3")
-    driver = None
-    price_str = None
-    pc_grade_key_found = "N/A"
-
-    print(f"Attempting to scrape PriceCharting URL: {url} for grade: '{grade_to_find}'")
-
-    try:
-        driver = webdriver.Chrome(options=options)
-        driver.get(url)
-        
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table#graded_table, div.main-content, div.graded-prices"))
-        )
-        print("PriceCharting page elements seem to be loaded.")
-
-        # Mapping of desired grades to how they appear on PriceCharting for robust matching
-        grade_text_map = {
-            "ungraded": "Ungraded",
-            "psa 10": "PSA 10", "psa 9.5": "PSA 9.5", "psa 9": "PSA 9", "psa 8": "PSA 8", "psa 7": "PSA 7",
-            "cgc 10": "CGC 10", "cgc 9.5": "CGC 9.5", "cgc 9": "CGC 9", "cgc 8": "CGC 8",
-            "bgs 10": "BGS 10", "bgs 9.5": "BGS 9.5", "bgs 9": "BGS 9", "bgs 8": "BGS 8",
-        }
-        
-        # Normalize the grade to find to PriceCharting's expected format
-        pc_grade_to_search = next((v for k, v in grade_text_map.items() if grade_to_find.lower() == k), None)
-        
-        # If the extracted grade from title was not directly mapped, and it's not explicitly 'ungraded',
-        # or if the grade itself suggests ungraded, default to "Ungraded".
-        if pc_grade_to_search is None or "ungraded" in grade_to_find.lower():
-            pc_grade_to_search = "Ungraded"
-
-        print(f"Normalized PriceCharting grade to search for: '{pc_grade_to_search}'")
-
-        # Attempt to find the price for the specific grade first
-        # XPath: finds a td element with normalized text equal to pc_grade_to_search,
-        # then finds its following sibling td that contains a '$' sign.
-        xpath_specific_grade = f"//td[normalize-space(text())='{pc_grade_to_search}']/following-sibling::td[contains(text(), '$')]"
-        print(f"Attempting XPath for specific grade '{pc_grade_to_search}': {xpath_specific_grade}")
-
-        try:
-            price_element = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, xpath_specific_grade))
-            )
-            price_str = price_element.text.strip()
-            pc_grade_key_found = pc_grade_to_search
-            print(f"Successfully found price for '{pc_grade_key_found}': {price_str}")
-        except Exception as e:
-            print(f"Price for '{pc_grade_to_search}' not found directly: {e}. Trying Ungraded as fallback.")
-            # Fallback to Ungraded if the specific grade isn't found or timed out
-            xpath_ungraded_fallback = "//td[normalize-space(text())='Ungraded']/following-sibling::td[contains(text(), '$')]"
-            try:
-                price_element = WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.XPATH, xpath_ungraded_fallback))
-                )
-                price_str = price_element.text.strip()
-                pc_grade_key_found = "Ungraded" # Mark as Ungraded fallback
-                print(f"Found Ungraded fallback price: {price_str}")
-            except Exception as e:
-                print(f"Ungraded fallback price not found either: {e}", file=sys.stderr)
-                price_str = None # Ensure price is None if nothing found
-
-    except Exception as e:
-        print(f"[DEBUG] Selenium error during scraping PriceCharting URL {url}: {e}", file=sys.stderr)
-    finally:
-        if driver:
-            driver.quit()
-            print("Chrome driver quit.")
+    table = get_grade_table(url)
+    price_str, pc_grade_key_found = grade_price(table, grade_to_find)
+    print(f"PriceCharting price for '{grade_to_find}': {price_str} (row '{pc_grade_key_found}')")
     return price_str, pc_grade_key_found
 
 def get_pricecharting_data(title):
@@ -226,16 +128,145 @@ def get_pricecharting_data(title):
     url = get_pricecharting_url(title)
     if not url:
         return (None, None, None) # price_str, url, grade_found
-    
-    extracted_grade = extract_grade_from_title(title)
-    price_str, pc_grade_found = scrape_pricecharting_price_from_url(url, extracted_grade)
+
+    cached = lookup_pricecharting_data(url, title)
+    if cached is None:
+        return (None, url, "N/A")
+    price_str, pc_grade_found = cached
     return (price_str, url, pc_grade_found)
 
+def lookup_pricecharting_data(url, title):
+    """
+    Returns [price_str, grade_found] for the title's grade on a PriceCharting URL,
+    or None when no price was found. Served from the cached grade table when possible.
+    """
+    price_str, pc_grade_found = scrape_pricecharting_price_from_url(url, extract_grade_from_title(title))
+    return [price_str, pc_grade_found] if price_str else None
+
+# Listings whose titles normalize the same, or that hit the same product and grade, share one lookup
+engine = ComparisonEngine(search_listings, [
+    PriceProvider("pricecharting", "PriceCharting", get_pricecharting_url, lookup_pricecharting_data,
+                  resolve_key=lambda title: get_catalog().resolve_key(title, "pricecharting", normalize_query),
+                  price_key=lambda url, title: (url, extract_grade_from_title(title))),
+])
+
 # --- Main Application Logic ---
 
+def listing_costs(item):
+    """
+    Returns (bid, cheapest shipping, total) for an eBay Listing.
+    """
+    return item.price, item.min_shipping, item.total
+
+@timed("profit_pass")
+def profit_cells(title, pc_price_str, pc_link, total):
+    """
+    Builds the PriceCharting price, link and profit cells plus the profit color tag.
+    """
+    profit = None
+    try:
+        # Validate and convert PriceCharting price string to float for calculation
+        # Check if pc_price_str is not None, not empty, and looks like a number (after cleaning)
+        if pc_price_str and re.match(r'^\$?\d{1,3}(,\d{3})*(\.\d+)?$', pc_price_str.strip()):
+            pc_price = float(pc_price_str.replace("$", "").replace(",", "").strip())
+            if pc_price is not None:
+                profit = round(pc_price - total, 2)
+        else:
+            print(f"Warning: PriceCharting price string '{pc_price_str}' for '{title}' is not a valid number format. Profit not calculated.")
+
+    except (ValueError, TypeError) as e:
+        print(f"Error converting PriceCharting price '{pc_price_str}' to float for '{title}': {e}", file=sys.stderr)
+        profit = None
+
+    profit_display = f"${profit:.2f}" if isinstance(profit, float) else "-"
+
+    tag = ""
+    if profit is None:
+        tag = ""
+    elif profit > 0:
+        tag = "profit_positive"
+    elif profit < 0:
+        tag = "profit_negative"
+    return (pc_price_str or "-", pc_link or "-", profit_display), tag # Display only the price
+
+def row_id(item):
+    return item.item_id or str(id(item))
+
+def show_listing(item):
+    """
+    Inserts a row as soon as the eBay data is known. PriceCharting cells are filled in by show_result.
+    """
+    iid = row_id(item)
+    if tree.exists(iid):
+        return
+    bid, shipping, total = listing_costs(item)
+    tree.insert("", tk.END, iid=iid, values=(
+        item.title,
+        f"${bid:.2f}",
+        f"${shipping:.2f}",
+        f"${total:.2f}",
+        format_time_left(item.end_date),
+        item.url,
+        "...",
+        "...",
+        "..."
+    ))
+    update_status()
+
+def show_result(result):
+    """
+    Fills in the PriceCharting price, link and profit of a row once its lookup finishes.
+    """
+    iid = row_id(result.item)
+    if not tree.exists(iid):
+        return
+    title = result.item.title
+    pc_price_str, pc_grade_found = result.price or (None, None)
+    print(f"Completed PriceCharting for '{title}'. Data: {(pc_price_str, result.link, pc_grade_found)}")
+    _, _, total = listing_costs(result.item)
+    cells, tag = profit_cells(title, pc_price_str, result.link, total)
+    values = list(tree.item(iid, "values"))
+    values[6:9] = cells
+    tree.item(iid, values=values, tags=(tag,))
+    update_status()
+
+def show_listings(items):
+    for item in items:
+        show_listing(item)
+
+def show_results(results):
+    for result in results:
+        show_result(result)
+
+def update_status():
+    status_var.set(f"{len(tree.get_children())} listings, {background_search.pending} lookups pending")
+    metrics_var.set(metrics.status_line())
+
+def search_finished(results):
+    search_button.config(state="normal")
+    print(f"Price cache stats: {get_price_cache().stats()}")
+    print(f"Engine stats: {engine.stats()}")
+    print(f"Metrics written to {metrics.write_prometheus()} and {metrics.write_summary(listings=len(results))}")
+    metrics_var.set(metrics.status_line())
+    if not results:
+        status_var.set("")
+        messagebox.showinfo("No Results", "No items found on eBay for your search criteria.")
+        print("No items found on eBay for the given keyword.")
+        return
+    status_var.set(f"{len(results)} listings, all lookups done")
+    print("Results displayed in GUI successfully.")
+
+def search_failed(error):
+    search_button.config(state="normal")
+    status_var.set("")
+    print(f"An unexpected error occurred in search_and_display: {error}", file=sys.stderr)
+    messagebox.showerror("Application Error", f"An unexpected error occurred: {error}\n\n"
+                                              f"Please check your console for detailed error messages.")
+
 def search_and_display():
     """
-    Handles the main search logic, fetches data, and updates the GUI.
+    Validates the input and starts the search on a worker thread.
+    Rows appear as eBay results arrive and are completed as lookups finish.
     """
     print("\n--- Search button clicked. Starting search_and_display ---")
     raw_input = entry.get().strip()
@@ -253,96 +284,14 @@ def search_and_display():
     buying_option = buying_option_var.get()
     print(f"Search parameters: Input='{value}', Type='{mode}', Buying Option='{buying_option}'")
 
-    try:
+    if mode == "keyword":
         tree.delete(*tree.get_children())
         print("Treeview cleared.")
-
-        if mode == "keyword":
-            print("Fetching items from eBay API...")
-            items = search_auctions(value, EBAY_OAUTH_TOKEN, buying_option)
-            
-            if not items:
-                messagebox.showinfo("No Results", "No items found on eBay for your search criteria.")
-                print("No items found on eBay for the given keyword.")
-                return
-
-            title_to_item = {item.get("title", "Unknown"): item for item in items}
-            
-            price_charting_data_cache = {}
-            print(f"Starting concurrent PriceCharting data fetching for {len(title_to_item)} items...")
-            
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                pc_futures = {executor.submit(get_pricecharting_data, title): title for title in title_to_item}
-                
-                for future in as_completed(pc_futures):
-                    title = pc_futures[future]
-                    try:
-                        pc_data = future.result()
-                        price_charting_data_cache[title] = pc_data
-                        print(f"Completed PriceCharting for '{title}'. Data: {pc_data}")
-                    except Exception as e:
-                        print(f"Error fetching PriceCharting for '{title}': {e}", file=sys.stderr)
-                        price_charting_data_cache[title] = (None, None, None)
-
-            print("Processing and displaying results in GUI...")
-            for title, item in title_to_item.items():
-                bid = get_price(item.get("currentBidPrice", item.get("price", {})))
-                shipping = 0.0
-                costs = []
-                for opt in item.get("shippingOptions", []):
-                    ship = get_price(opt.get("shippingCost", {})) + get_price(opt.get("importCharge", {}))
-                    if ship >= 0:
-                        costs.append(ship)
-                if costs:
-                    shipping = min(costs)
-                total = bid + shipping
-                time_left = format_time_left(item.get("itemEndDate", ""))
-                ebay_url = item.get("itemWebUrl", "")
-                
-                # Retrieve PriceCharting data
-                pc_price_str, pc_link, pc_grade_found = price_charting_data_cache.get(title, (None, None, None))
-                
-                profit = None
-                try:
-                    # Validate and convert PriceCharting price string to float for calculation
-                    # Check if pc_price_str is not None, not empty, and looks like a number (after cleaning)
-                    if pc_price_str and re.match(r'^\$?\d{1,3}(,\d{3})*(\.\d+)?$', pc_price_str.strip()):
-                        pc_price = float(pc_price_str.replace("$", "").replace(",", "").strip())
-                        if pc_price is not None:
-                            profit = round(pc_price - total, 2)
-                    else:
-                        print(f"Warning: PriceCharting price string '{pc_price_str}' for '{title}' is not a valid number format. Profit not calculated.")
-
-                except (ValueError, TypeError) as e:
-                    print(f"Error converting PriceCharting price '{pc_price_str}' to float for '{title}': {e}", file=sys.stderr)
-                    profit = None
-
-                profit_display = f"${profit:.2f}" if isinstance(profit, float) else "-"
-
-                tag = ""
-                if profit is None:
-                    tag = ""
-                elif profit > 0:
-                    tag = "profit_positive"
-                elif profit < 0:
-                    tag = "profit_negative"
-                
-                tree.insert("", tk.END, values=(
-                    title,
-                    f"${bid:.2f}",
-                    f"${shipping:.2f}",
-                    f"${total:.2f}",
-                    time_left,
-                    ebay_url,
-                    pc_price_str or "-", # Display only the price
-                    pc_link or "-",
-                    profit_display
-                ), tags=(tag,))
-            print("Results displayed in GUI successfully.")
-    except Exception as e:
-        print(f"An unexpected error occurred in search_and_display: {e}", file=sys.stderr)
-        messagebox.showerror("Application Error", f"An unexpected error occurred: {e}\n\n"
-                                                  f"Please check your console for detailed error messages.")
+        metrics.start_run()
+        search_button.config(state="disabled")
+        status_var.set("Searching eBay...")
+        print("Fetching items from eBay API and PriceCharting data...")
+        background_search.start((value, buying_option))
 
 def open_link(event):
     """
@@ -366,84 +315,96 @@ def open_link(event):
 
 # --- GUI Setup ---
 
-root = tk.Tk()
-root.title("PriceCharting vs eBay Auction Viewer")
-
-# Dark mode colors
-BG_COLOR = "#121212"
-FG_COLOR = "white"
-TREE_BG = "#1e1e1e"
-TREE_ALT_BG = "#2c2c2c"
-TREE_FG = "white"
-PROFIT_GREEN = "#00ff00"
-PROFIT_RED = "#ff5555"
-
-root.configure(bg=BG_COLOR)
-
-frame = tk.Frame(root, bg=BG_COLOR)
-frame.pack(padx=10, pady=10)
-
-entry = tk.Entry(frame, width=60, bg="#222222", fg=FG_COLOR, insertbackground=FG_COLOR, relief="flat",
-                 font=('Arial', 10))
-entry.grid(row=0, column=0, padx=5, pady=5)
-
-buying_option_var = tk.StringVar(value="Auction")
-buying_option_combo = ttk.Combobox(frame, textvariable=buying_option_var, values=["Auction", "Buy Now"], 
-                                   state="readonly", width=10, font=('Arial', 10))
-buying_option_combo.grid(row=0, column=1, padx=5, pady=5)
-style = ttk.Style()
-style.map('TCombobox', fieldbackground=[('readonly', '#222222')], selectbackground=[('readonly', '#333333')],
-          selectforeground=[('readonly', FG_COLOR)], background=[('readonly', '#333333')], foreground=[('readonly', FG_COLOR)])
-
-
-search_button = tk.Button(frame, text="Search", command=search_and_display, 
-                          bg="#333333", fg=FG_COLOR, relief="flat", activebackground="#444444",
-                          font=('Arial', 10, 'bold'), padx=10, pady=5)
-search_button.grid(row=0, column=2, padx=5, pady=5)
-
-# Treeview for displaying results - Updated column name
-columns = ("Title", "Bid", "Shipping", "Total", "Time Left", "eBay URL", "PriceCharting Price", "PriceCharting Link", "Profit")
-tree = ttk.Treeview(root, columns=columns, show="headings", selectmode="browse")
-tree.pack(padx=10, pady=10, fill="both", expand=True)
-
-# Configure Treeview style
-style.theme_use('default')
-
-style.configure("Treeview",
-                background=TREE_BG,
-                foreground=TREE_FG,
-                fieldbackground=TREE_BG,
-                rowheight=25,
-                borderwidth=0,
-                relief="flat",
-                font=('Arial', 10))
-
-style.map('Treeview',
-           background=[('selected', '#555555')],
-           foreground=[('selected', 'white')])
-
-style.configure("Treeview.Heading",
-                background="#333333",
-                foreground=FG_COLOR,
-                font=('Arial', 10, 'bold'),
-                relief="flat")
-
-tree.tag_configure('oddrow', background=TREE_ALT_BG)
-tree.tag_configure('evenrow', background=TREE_BG)
-
-tree.tag_configure("profit_positive", foreground=PROFIT_GREEN)
-tree.tag_configure("profit_negative", foreground=PROFIT_RED)
-
-for col_name in columns:
-    tree.heading(col_name, text=col_name)
-    tree.column(col_name, width=120, anchor="w")
-    
-tree.column("Title", width=250)
-tree.column("eBay URL", width=240)
-tree.column("PriceCharting Price", width=150, anchor="center") # Adjusted width and centered
-tree.column("PriceCharting Link", width=240)
-tree.column("Profit", width=80, anchor="center")
-
-tree.bind("<Double-1>", open_link)
-
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("PriceCharting vs eBay Auction Viewer")
+
+    # Dark mode colors
+    BG_COLOR = "#121212"
+    FG_COLOR = "white"
+    TREE_BG = "#1e1e1e"
+    TREE_ALT_BG = "#2c2c2c"
+    TREE_FG = "white"
+    PROFIT_GREEN = "#00ff00"
+    PROFIT_RED = "#ff5555"
+
+    root.configure(bg=BG_COLOR)
+
+    frame = tk.Frame(root, bg=BG_COLOR)
+    frame.pack(padx=10, pady=10)
+
+    entry = tk.Entry(frame, width=60, bg="#222222", fg=FG_COLOR, insertbackground=FG_COLOR, relief="flat",
+                     font=('Arial', 10))
+    entry.grid(row=0, column=0, padx=5, pady=5)
+
+    buying_option_var = tk.StringVar(value="Auction")
+    buying_option_combo = ttk.Combobox(frame, textvariable=buying_option_var, values=["Auction", "Buy Now"], 
+                                       state="readonly", width=10, font=('Arial', 10))
+    buying_option_combo.grid(row=0, column=1, padx=5, pady=5)
+    style = ttk.Style()
+    style.map('TCombobox', fieldbackground=[('readonly', '#222222')], selectbackground=[('readonly', '#333333')],
+              selectforeground=[('readonly', FG_COLOR)], background=[('readonly', '#333333')], foreground=[('readonly', FG_COLOR)])
+
+
+    search_button = tk.Button(frame, text="Search", command=search_and_display, 
+                              bg="#333333", fg=FG_COLOR, relief="flat", activebackground="#444444",
+                              font=('Arial', 10, 'bold'), padx=10, pady=5)
+    search_button.grid(row=0, column=2, padx=5, pady=5)
+
+    # Treeview for displaying results - Updated column name
+    columns = ("Title", "Bid", "Shipping", "Total", "Time Left", "eBay URL", "PriceCharting Price", "PriceCharting Link", "Profit")
+    tree = ttk.Treeview(root, columns=columns, show="headings", selectmode="browse")
+    tree.pack(padx=10, pady=10, fill="both", expand=True)
+
+    # Configure Treeview style
+    style.theme_use('default')
+
+    style.configure("Treeview",
+                    background=TREE_BG,
+                    foreground=TREE_FG,
+                    fieldbackground=TREE_BG,
+                    rowheight=25,
+                    borderwidth=0,
+                    relief="flat",
+                    font=('Arial', 10))
+
+    style.map('Treeview',
+               background=[('selected', '#555555')],
+               foreground=[('selected', 'white')])
+
+    style.configure("Treeview.Heading",
+                    background="#333333",
+                    foreground=FG_COLOR,
+                    font=('Arial', 10, 'bold'),
+                    relief="flat")
+
+    tree.tag_configure('oddrow', background=TREE_ALT_BG)
+    tree.tag_configure('evenrow', background=TREE_BG)
+
+    tree.tag_configure("profit_positive", foreground=PROFIT_GREEN)
+    tree.tag_configure("profit_negative", foreground=PROFIT_RED)
+
+    for col_name in columns:
+        tree.heading(col_name, text=col_name)
+        tree.column(col_name, width=120, anchor="w")
+
+    tree.column("Title", width=250)
+    tree.column("eBay URL", width=240)
+    tree.column("PriceCharting Price", width=150, anchor="center") # Adjusted width and centered
+    tree.column("PriceCharting Link", width=240)
+    tree.column("Profit", width=80, anchor="center")
+
+    tree.bind("<Double-1>", open_link)
+
+    status_var = tk.StringVar()
+    status_label = tk.Label(root, textvariable=status_var, bg=BG_COLOR, fg=FG_COLOR, anchor="w", font=('Arial', 10))
+    status_label.pack(padx=10, pady=(0, 2), fill="x")
+
+    # Per-stage p95 latencies, cache hits, retries and timeouts of the current search
+    metrics_var = tk.StringVar()
+    metrics_label = tk.Label(root, textvariable=metrics_var, bg=BG_COLOR, fg="#aaaaaa", anchor="w", font=('Arial', 9))
+    metrics_label.pack(padx=10, pady=(0, 10), fill="x")
+
+    background_search = BackgroundSearch(root, engine, show_listings, show_results, search_finished, search_failed)
+
+    root.mainloop()
@@ -0,0 +1,273 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
+import webbrowser
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.background_search import BackgroundSearch
+from Common.ebay_search import extract_input_type, extract_item_ids
+from Common.price_cache import get_price_cache
+from Common.listing_table import ListingTable, TAG_NAMES, money_text
+from Common.metrics import metrics
+from Common.virtual_table import VirtualTable
+from Common.providers import create_engine
+
+# Columns before the per-provider price, link and profit columns
+BASE_COLUMNS = ("Title", "Bid", "Shipping", "Total", "Time Left", "eBay URL")
+
+def format_time_left(end_time):
+    try:
+        end = datetime.strptime(end_time, "%Y-%m-%dT%H:%M:%S.%fZ")
+        now = datetime.utcnow()
+        delta = end - now
+        days = delta.days
+        hours, rem = divmod(delta.seconds, 3600)
+        minutes, _ = divmod(rem, 60)
+        return f"{days}d {hours}h {minutes}m"
+    except:
+        return "-"
+
+def row_id(item):
+    return item.item_id or str(id(item))
+
+def row_cells(row):
+    # Only called for the rows on screen; a provider's cells show "..." until its lookup finishes
+    table = tables[first_provider]
+    item = table.items[row]
+    cells = []
+    for provider_table in tables.values():
+        if provider_table.priced[row]:
+            cells += [provider_table.price_texts[row] or "-", provider_table.links[row] or "-",
+                      money_text(provider_table.profit[row])]
+        else:
+            cells += ["...", "...", "..."]
+    # Rows are colored by their best profit across providers
+    best = np.fmax.reduce([provider_table.profit[row] for provider_table in tables.values()])
+    tag = TAG_NAMES[1 if best > 0 else 2 if best < 0 else 0]
+    return (
+        item.title,
+        money_text(table.bid[row]),
+        money_text(table.shipping[row]),
+        money_text(table.total[row]),
+        format_time_left(item.end_date),
+        item.url,
+        *cells
+    ), (tag,)
+
+def order_rows(count, column, descending, text):
+    # Runs on the table's worker thread; headings sort on the table of the provider they belong to
+    rows = tables[first_provider].view(count, text=text)
+    if column:
+        name, field = column
+        rows = tables[name].order(field, descending, rows)
+    return rows
+
+def show_listings(items):
+    # Every provider's table gets the same listings, so row numbers line up across them
+    for provider_table in tables.values():
+        provider_table.add_items(items)
+    results_view.update_rows(len(tables[first_provider]))
+    update_status()
+
+def show_results(results):
+    # One vectorized profit pass per provider for the whole batch
+    table = tables[first_provider]
+    rows, batch = [], []
+    for result in results:
+        row = table.row_of(row_id(result.item))
+        if row is not None:
+            rows.append(row)
+            batch.append(result)
+    if not rows:
+        return
+    for name, provider_table in tables.items():
+        quotes = [result.quotes[name] for result in batch]
+        provider_table.set_market_prices(rows, [quote.price for quote in quotes], [quote.link for quote in quotes])
+        provider_table.compute(rows)
+    results_view.update_rows(len(table))
+    update_status()
+
+def listing_count():
+    total = len(tables[first_provider])
+    if results_view.filter_text:
+        return f"{results_view.shown} of {total} listings"
+    return f"{total} listings"
+
+def update_status():
+    if background_search.running:
+        status_var.set(f"{listing_count()}, {background_search.pending} lookups pending")
+    else:
+        status_var.set(f"{listing_count()}, all lookups done" if len(tables[first_provider]) else "")
+    metrics_var.set(metrics.status_line())
+
+def search_finished(results):
+    print("[DEBUG] Price cache:", get_price_cache().stats())
+    print("[DEBUG] Engine:", engine.stats())
+    print("[DEBUG] Metrics:", metrics.write_prometheus(), metrics.write_summary(listings=len(results)))
+    search_button.config(state="normal")
+    load_button.config(state="normal")
+    update_status()
+
+def search_failed(error):
+    search_button.config(state="normal")
+    load_button.config(state="normal")
+    status_var.set("")
+    messagebox.showerror("Error", str(error))
+
+def search_and_display():
+    raw_input = entry.get().strip()
+    if not raw_input:
+        messagebox.showwarning("Input Required", "Please enter a keyword or eBay URL.")
+        return
+
+    mode, value = extract_input_type(raw_input)
+    if mode == "invalid":
+        messagebox.showerror("Invalid", "Invalid eBay URL or keyword.")
+        return
+
+    start_search((mode, value, buying_option_var.get()))
+
+def load_item_urls():
+    # Saved-item lists are fetched 20 listings per eBay request
+    path = filedialog.askopenfilename(title="Load eBay item URLs",
+                                      filetypes=[("Text files", "*.txt *.csv"), ("All files", "*.*")])
+    if not path:
+        return
+    with open(path, encoding="utf-8") as f:
+        item_ids = extract_item_ids(f.read())
+    if not item_ids:
+        messagebox.showerror("Invalid", "No eBay item URLs found in that file.")
+        return
+    start_search(("items", item_ids, buying_option_var.get()))
+
+def start_search(query):
+    # One eBay search feeds every provider; rows stream in through background_search
+    results_view.reset()
+    for provider_table in tables.values():
+        provider_table.clear()
+    metrics.start_run()
+    search_button.config(state="disabled")
+    load_button.config(state="disabled")
+    mode, value, _ = query
+    status_var.set(f"Fetching {len(value)} eBay items..." if mode == "items" else "Searching eBay...")
+    background_search.start(query)
+
+def apply_filter(event=None):
+    # The listing count in the status line follows once the filter has run (on_rows)
+    results_view.set_filter(filter_var.get())
+
+def open_link(event):
+    selected_item = tree.focus()
+    if selected_item:
+        column = tree.identify_column(event.x)
+        values = tree.item(selected_item, 'values')
+        index = int(column[1:]) - 1 if column else -1
+        if 0 <= index < len(values) and str(values[index]).startswith("http"):
+            webbrowser.open_new_tab(values[index])
+
+if __name__ == "__main__":
+    engine = create_engine()
+    first_provider = engine.providers[0].name
+
+    root = tk.Tk()
+    root.title(" / ".join(provider.label for provider in engine.providers) + " vs eBay Auction Viewer")
+
+    # Dark mode colors
+    BG_COLOR = "#121212"
+    FG_COLOR = "white"
+    TREE_BG = "#1e1e1e"
+    TREE_ALT_BG = "#2c2c2c"
+    TREE_FG = "white"
+    PROFIT_GREEN = "#00ff00"
+    PROFIT_RED = "#ff5555"
+
+    root.configure(bg=BG_COLOR)
+
+    frame = tk.Frame(root, bg=BG_COLOR)
+    frame.pack(padx=10, pady=10)
+
+    entry = tk.Entry(frame, width=60, bg="#222222", fg=FG_COLOR, insertbackground=FG_COLOR, relief="flat")
+    entry.grid(row=0, column=0, padx=5)
+
+    buying_option_var = tk.StringVar(value="Auction")
+    buying_option_combo = ttk.Combobox(frame, textvariable=buying_option_var, values=["Auction", "Buy Now"], state="readonly", width=10)
+    buying_option_combo.grid(row=0, column=1, padx=5)
+
+    search_button = tk.Button(frame, text="Search", command=search_and_display, bg="#333333", fg=FG_COLOR, relief="flat", activebackground="#444444")
+    search_button.grid(row=0, column=2, padx=5)
+
+    load_button = tk.Button(frame, text="Load URLs...", command=load_item_urls, bg="#333333", fg=FG_COLOR, relief="flat", activebackground="#444444")
+    load_button.grid(row=0, column=3, padx=5)
+
+    # Narrows the table to titles containing every typed word
+    filter_label = tk.Label(frame, text="Filter", bg=BG_COLOR, fg=FG_COLOR)
+    filter_label.grid(row=0, column=4, padx=(15, 5))
+    filter_var = tk.StringVar()
+    filter_entry = tk.Entry(frame, textvariable=filter_var, width=20, bg="#222222", fg=FG_COLOR, insertbackground=FG_COLOR, relief="flat")
+    filter_entry.grid(row=0, column=5, padx=5)
+    filter_entry.bind("<KeyRelease>", apply_filter)
+
+    # Sortable headings -> (provider whose table is sorted, ListingTable column)
+    SORT_COLUMNS = {"Bid": (first_provider, "bid"), "Shipping": (first_provider, "shipping"),
+                    "Total": (first_provider, "total"), "Time Left": (first_provider, "end_time")}
+    columns = list(BASE_COLUMNS)
+    for provider in engine.providers:
+        columns += [f"{provider.label} Price", f"{provider.label} Link", f"{provider.label} Profit"]
+        SORT_COLUMNS[f"{provider.label} Price"] = (provider.name, "market_price")
+        SORT_COLUMNS[f"{provider.label} Profit"] = (provider.name, "profit")
+    tables = {provider.name: ListingTable() for provider in engine.providers}
+    # Only the rows on screen exist as Treeview items; sorting and filtering run off the Tk thread
+    results_view = VirtualTable(root, columns, row_cells, order_rows, SORT_COLUMNS,
+                                ascending_columns=((first_provider, "end_time"),), on_rows=update_status, bg=BG_COLOR)
+    results_view.pack(padx=10, pady=10, fill="both", expand=True)
+    tree = results_view.tree
+
+    style = ttk.Style()
+    style.theme_use('default')
+
+    style.configure("Treeview",
+                    background=TREE_BG,
+                    foreground=TREE_FG,
+                    fieldbackground=TREE_BG,
+                    highlightthickness=0,
+                    bd=0,
+                    font=('Arial', 10))
+
+    style.map('Treeview', background=[('selected', '#555555')], foreground=[('selected', 'white')])
+
+    style.configure("Treeview.Heading",
+                    background="#333333",
+                    foreground=FG_COLOR,
+                    relief="flat")
+
+    # Profit coloring tags
+    tree.tag_configure("profit_positive", foreground=PROFIT_GREEN)
+    tree.tag_configure("profit_negative", foreground=PROFIT_RED)
+
+    # Set column widths & anchors
+    for col in columns:
+        tree.column(col, width=100, anchor="w")
+    tree.column("Title", width=250)
+    tree.column("eBay URL", width=200)
+    for provider in engine.providers:
+        tree.column(f"{provider.label} Link", width=200)
+        tree.column(f"{provider.label} Profit", width=90, anchor="center")
+
+    tree.bind("<Double-1>", open_link)
+
+    status_var = tk.StringVar()
+    status_label = tk.Label(root, textvariable=status_var, bg=BG_COLOR, fg=FG_COLOR, anchor="w")
+    status_label.pack(padx=10, pady=(0, 2), fill="x")
+
+    # Per-stage p95 latencies, cache hits, retries and timeouts of the current search
+    metrics_var = tk.StringVar()
+    metrics_label = tk.Label(root, textvariable=metrics_var, bg=BG_COLOR, fg="#aaaaaa", anchor="w")
+    metrics_label.pack(padx=10, pady=(0, 10), fill="x")
+
+    background_search = BackgroundSearch(root, engine, show_listings, show_results, search_finished, search_failed)
+
+    root.mainloop()
@@ -4,19 +4,19 @@ from tkinter import ttk, messagebox, scrolledtext
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime, timezone
 import re
+import os
+import sys
 
-# === API Functions ===
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common import config
+from Common.ebay_auth import ebay_get
+from Common.ebay_search import iter_item_summaries
 
-def search_auctions(query_dict, token, limit=20):
-    url = "https://api.ebay.com/buy/browse/v1/item_summary/search"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
+# === API Functions ===
 
+def search_auctions(query_dict, token=None, limit=None):
     params = {
-        "q": query_dict["q"],
-        "limit": limit
+        "q": query_dict["q"]
     }
 
     if query_dict["filter"]:
@@ -26,17 +26,12 @@ def search_auctions(query_dict, token, limit=20):
     if query_dict["category_ids"]:
         params["category_ids"] = query_dict["category_ids"]
 
-    resp = requests.get(url, headers=headers, params=params)
-    resp.raise_for_status()
-    return resp.json().get("itemSummaries", [])
+    return list(iter_item_summaries(params, token, max_items=limit or config.MAX_RESULTS,
+                                    parallel_pages=config.PAGE_FETCH_WORKERS))
 
-def get_item_by_id(item_id, token):
-    url = f"https://api.ebay.com/buy/browse/v1/item/{item_id}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    resp = requests.get(url, headers=headers)
+def get_item_by_id(item_id, token=None):
+    url = f"{config.EBAY_API_BASE}/buy/browse/v1/item/{item_id}"
+    resp = ebay_get(url, token=token)
     resp.raise_for_status()
     return resp.json()
 
@@ -134,9 +129,6 @@ def search_and_display():
         messagebox.showwarning("Input Required", "Please enter a keyword or eBay URL.")
         return
 
-    # === PASTE YOUR OAUTH TOKEN BELOW ===
-    token = r"""PUT EBAY OAUTH TOKEN HERE"""
-
     mode, value = extract_input_type(raw_input)
 
     if mode == "invalid":
@@ -147,10 +139,10 @@ def search_and_display():
         output.delete(1.0, tk.END)
 
         if mode == "item_id":
-            item = get_item_by_id(value, token)
+            item = get_item_by_id(value)
             display_item(item)
         elif mode == "keyword":
-            items = search_auctions(value, token)
+            items = search_auctions(value)
             if not items:
                 output.insert(tk.END, "No auction results found.")
             else:
@@ -195,21 +187,22 @@ def display_item(item):
 
 # === GUI Setup ===
 
-root = tk.Tk()
-root.title("eBay Auction Cost Viewer")
-root.geometry("750x550")
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("eBay Auction Cost Viewer")
+    root.geometry("750x550")
 
-frame = ttk.Frame(root, padding=10)
-frame.pack(fill=tk.BOTH, expand=True)
+    frame = ttk.Frame(root, padding=10)
+    frame.pack(fill=tk.BOTH, expand=True)
 
-ttk.Label(frame, text="Enter keyword, eBay search URL, or item URL:").pack(anchor=tk.W)
-entry = ttk.Entry(frame, width=65)
-entry.pack(anchor=tk.W, pady=5)
+    ttk.Label(frame, text="Enter keyword, eBay search URL, or item URL:").pack(anchor=tk.W)
+    entry = ttk.Entry(frame, width=65)
+    entry.pack(anchor=tk.W, pady=5)
 
-search_btn = ttk.Button(frame, text="Search", command=search_and_display)
-search_btn.pack(anchor=tk.W, pady=5)
+    search_btn = ttk.Button(frame, text="Search", command=search_and_display)
+    search_btn.pack(anchor=tk.W, pady=5)
 
-output = scrolledtext.ScrolledText(frame, wrap=tk.WORD, height=25)
-output.pack(fill=tk.BOTH, expand=True, pady=10)
+    output = scrolledtext.ScrolledText(frame, wrap=tk.WORD, height=25)
+    output.pack(fill=tk.BOTH, expand=True, pady=10)
 
-root.mainloop()
+    root.mainloop()
@@ -1,57 +1,18 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import requests
-from urllib.parse import quote_plus
-from serpapi import GoogleSearch
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import re
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import webbrowser
-
-EBAY_OAUTH_TOKEN = r"""PUT EBAY OAUTH TOKEN HERE"""
-SERPAPI_KEY = "PUT SERP API KEY HERE"
-
-def extract_input_type(text):
-    if "ebay.com" in text:
-        try:
-            query = re.search(r"/itm/(\d+)", text)
-            if query:
-                return "url", query.group(1)
-        except:
-            return "invalid", None
-    else:
-        return "keyword", text
-
-def search_auctions(keyword, token, buying_option="AUCTION"):
-    buying_option = buying_option.upper()
-    if buying_option == "AUCTION":
-        filter_str = "buyingOptions:{AUCTION}"
-    elif buying_option == "BUY NOW":
-        filter_str = "buyingOptions:{FIXED_PRICE}"
-    else:
-        filter_str = ""
-
-    url = f"https://api.ebay.com/buy/browse/v1/item_summary/search?q={quote_plus(keyword)}"
-    if filter_str:
-        url += f"&filter={filter_str}"
-    url += "&limit=10"
-
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    r = requests.get(url, headers=headers)
-    return r.json().get("itemSummaries", [])
-
-def get_price(obj):
-    if obj and "value" in obj:
-        return float(obj["value"])
-    return 0.0
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.background_search import BackgroundSearch
+from Common.ebay_search import extract_input_type, extract_item_ids
+from Common.price_cache import get_price_cache
+from Common.listing_table import ListingTable, TAG_NAMES, money_text, percent_text
+from Common.metrics import metrics
+from Common.virtual_table import VirtualTable
+from Common.pricecharting import create_engine
 
 def format_time_left(end_time):
     try:
@@ -65,72 +26,72 @@ def format_time_left(end_time):
     except:
         return "-"
 
-def clean_title_for_search(title):
-    title_upper = title.upper()
-    grade_match = re.search(r'\b(PSA|BGS|CGC)\s?\d{1,2}\b', title_upper)
-    grade = grade_match.group(0) if grade_match else ""
-
-    # Grab likely Pokémon name or set (first 1–3 capitalized words before grade)
-    name_part = title_upper.split(grade)[0] if grade else title_upper
-    name_tokens = re.findall(r'\b[A-Z][a-zA-Z0-9\-\']{2,}\b', name_part)
-    name = " ".join(name_tokens[:3])  # Limit tokens to first 3
-
-    cleaned = f"{name} {grade}".strip()
-    return cleaned
-
-def get_pricecharting_url(title):
-    params = {
-        "engine": "google",
-        "q": f"{title} site:pricecharting.com",
-        "api_key": SERPAPI_KEY
-    }
-    try:
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        for result in results.get("organic_results", []):
-            link = result.get("link", "")
-            if "pricecharting.com" in link and "/product" in link:
-                return link
-    except Exception as e:
-        print("[DEBUG] SerpApi error:", e)
-    return None
-
-def scrape_pricecharting_price_from_url(url):
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--log-level=3")
-    driver = webdriver.Chrome(options=options)
-    try:
-        driver.get(url)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "td.price"))
-        )
-        price_elements = driver.find_elements(By.CSS_SELECTOR, "td.price")
-        for el in price_elements:
-            price_text = el.text.strip()
-            if "$" in price_text:
-                match = re.search(r"\$\d{1,5}(\.\d{2})?", price_text)
-                if match:
-                    return match.group(0)
-        text = driver.page_source
-        match = re.search(r"\$\d{1,5}(\.\d{2})?", text)
-        if match:
-            return match.group(0)
-    except Exception as e:
-        print("[DEBUG] PriceCharting scraping error:", e)
-    finally:
-        driver.quit()
-    return None
-
-def get_pricecharting_price(title):
-    cleaned_title = clean_title_for_search(title)
-    url = get_pricecharting_url(cleaned_title)
-    if not url:
-        return (None, None)
-    price = scrape_pricecharting_price_from_url(url)
-    return (price, url)
+def row_id(item):
+    return item.item_id or str(id(item))
+
+def row_cells(row):
+    # Only called for the rows on screen; price cells show "..." until the lookup finishes
+    item = table.items[row]
+    if table.priced[row]:
+        prices = (table.price_texts[row] or "-", table.links[row] or "-",
+                  money_text(table.profit[row]), percent_text(table.roi[row]))
+    else:
+        prices = ("...", "...", "...", "...")
+    return (
+        item.title,
+        money_text(table.bid[row]),
+        money_text(table.shipping[row]),
+        money_text(table.total[row]),
+        format_time_left(item.end_date),
+        item.url,
+        *prices
+    ), (TAG_NAMES[table.tag[row]],)
+
+def show_listings(items):
+    # Called as soon as the eBay data is known; price cells are filled in later
+    table.add_items(items)
+    results_view.update_rows(len(table))
+    update_status()
+
+def show_results(results):
+    # Profit, ROI and tags for the whole batch are computed in one vectorized pass
+    rows, prices, links = [], [], []
+    for result in results:
+        row = table.row_of(row_id(result.item))
+        if row is not None:
+            rows.append(row)
+            prices.append(result.price)
+            links.append(result.link)
+    table.set_market_prices(rows, prices, links)
+    table.compute(rows)
+    results_view.update_rows(len(table))
+    update_status()
+
+def listing_count():
+    if results_view.filter_text:
+        return f"{results_view.shown} of {len(table)} listings"
+    return f"{len(table)} listings"
+
+def update_status():
+    if background_search.running:
+        status_var.set(f"{listing_count()}, {background_search.pending} lookups pending")
+    else:
+        status_var.set(f"{listing_count()}, all lookups done" if len(table) else "")
+    metrics_var.set(metrics.status_line())
+
+def search_finished(results):
+    print("[DEBUG] Price cache:", get_price_cache().stats())
+    print("[DEBUG] Engine:", engine.stats())
+    print("[DEBUG] Metrics:", metrics.write_prometheus(), metrics.write_summary(listings=len(results)))
+    search_button.config(state="normal")
+    load_button.config(state="normal")
+    update_status()
+
+def search_failed(error):
+    search_button.config(state="normal")
+    load_button.config(state="normal")
+    status_var.set("")
+    messagebox.showerror("Error", str(error))
 
 def search_and_display():
     raw_input = entry.get().strip()
@@ -143,67 +104,35 @@ def search_and_display():
         messagebox.showerror("Invalid", "Invalid eBay URL or keyword.")
         return
 
-    buying_option = buying_option_var.get()
+    start_search((mode, value, buying_option_var.get()))
 
-    try:
-        tree.delete(*tree.get_children())
-        if mode == "keyword":
-            items = search_auctions(value, EBAY_OAUTH_TOKEN, buying_option)
-            title_to_item = {item.get("title", "Unknown"): item for item in items}
-            pricecharting_cache = {}
-            with ThreadPoolExecutor(max_workers=8) as executor:
-                futures = {executor.submit(get_pricecharting_price, title): title for title in title_to_item}
-                for future in as_completed(futures):
-                    title = futures[future]
-                    try:
-                        pricecharting_cache[title] = future.result()
-                    except:
-                        pricecharting_cache[title] = (None, None)
-
-            for title, item in title_to_item.items():
-                bid = get_price(item.get("currentBidPrice", item.get("price", {})))
-                shipping = 0.0
-                costs = []
-                for opt in item.get("shippingOptions", []):
-                    ship = get_price(opt.get("shippingCost", {})) + get_price(opt.get("importCharge", {}))
-                    if ship >= 0:
-                        costs.append(ship)
-                if costs:
-                    shipping = min(costs)
-                total = bid + shipping
-                time_left = format_time_left(item.get("itemEndDate", ""))
-                url = item.get("itemWebUrl", "")
-                pc_price_str, pc_link = pricecharting_cache.get(title, (None, None))
-
-                try:
-                    pc_price = float(pc_price_str.replace("$", "")) if pc_price_str and "$" in pc_price_str else None
-                    profit = round(pc_price - total, 2) if pc_price is not None else None
-                except:
-                    profit = None
-
-                profit_display = f"${profit:.2f}" if isinstance(profit, float) else "-"
-
-                # Profit color tag
-                if profit is None or profit == 0:
-                    tag = ""
-                elif profit > 0:
-                    tag = "profit_positive"
-                else:
-                    tag = "profit_negative"
-
-                tree.insert("", tk.END, values=(
-                    title,
-                    f"${bid:.2f}",
-                    f"${shipping:.2f}",
-                    f"${total:.2f}",
-                    time_left,
-                    url,
-                    pc_price_str or "-",
-                    pc_link or "-",
-                    profit_display
-                ), tags=(tag,))
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+def load_item_urls():
+    # Saved-item lists are fetched 20 listings per eBay request
+    path = filedialog.askopenfilename(title="Load eBay item URLs",
+                                      filetypes=[("Text files", "*.txt *.csv"), ("All files", "*.*")])
+    if not path:
+        return
+    with open(path, encoding="utf-8") as f:
+        item_ids = extract_item_ids(f.read())
+    if not item_ids:
+        messagebox.showerror("Invalid", "No eBay item URLs found in that file.")
+        return
+    start_search(("items", item_ids, buying_option_var.get()))
+
+def start_search(query):
+    # The search runs on a worker thread; rows stream in through background_search
+    results_view.reset()
+    table.clear()
+    metrics.start_run()
+    search_button.config(state="disabled")
+    load_button.config(state="disabled")
+    mode, value, _ = query
+    status_var.set(f"Fetching {len(value)} eBay items..." if mode == "items" else "Searching eBay...")
+    background_search.start(query)
+
+def apply_filter(event=None):
+    # The listing count in the status line follows once the filter has run (on_rows)
+    results_view.set_filter(filter_var.get())
 
 def open_link(event):
     selected_item = tree.focus()
@@ -215,68 +144,98 @@ def open_link(event):
         elif region == '#8' and values[7].startswith("http"):
             webbrowser.open_new_tab(values[7])
 
-root = tk.Tk()
-root.title("PriceCharting vs eBay Auction Viewer")
-
-# Dark mode colors
-BG_COLOR = "#121212"
-FG_COLOR = "white"
-TREE_BG = "#1e1e1e"
-TREE_ALT_BG = "#2c2c2c"
-TREE_FG = "white"
-PROFIT_GREEN = "#00ff00"
-PROFIT_RED = "#ff5555"
-
-root.configure(bg=BG_COLOR)
-
-frame = tk.Frame(root, bg=BG_COLOR)
-frame.pack(padx=10, pady=10)
-
-entry = tk.Entry(frame, width=60, bg="#222222", fg=FG_COLOR, insertbackground=FG_COLOR, relief="flat")
-entry.grid(row=0, column=0, padx=5)
-
-buying_option_var = tk.StringVar(value="Auction")
-buying_option_combo = ttk.Combobox(frame, textvariable=buying_option_var, values=["Auction", "Buy Now"], state="readonly", width=10)
-buying_option_combo.grid(row=0, column=1, padx=5)
-
-search_button = tk.Button(frame, text="Search", command=search_and_display, bg="#333333", fg=FG_COLOR, relief="flat", activebackground="#444444")
-search_button.grid(row=0, column=2, padx=5)
-
-columns = ("Title", "Bid", "Shipping", "Total", "Time Left", "eBay URL", "PriceCharting Price", "PriceCharting Link", "Profit")
-tree = ttk.Treeview(root, columns=columns, show="headings", selectmode="browse")
-tree.pack(padx=10, pady=10, fill="both", expand=True)
-
-style = ttk.Style()
-style.theme_use('default')
-
-style.configure("Treeview",
-                background=TREE_BG,
-                foreground=TREE_FG,
-                fieldbackground=TREE_BG,
-                highlightthickness=0,
-                bd=0,
-                font=('Arial', 10))
-
-style.map('Treeview', background=[('selected', '#555555')], foreground=[('selected', 'white')])
-
-style.configure("Treeview.Heading",
-                background="#333333",
-                foreground=FG_COLOR,
-                relief="flat")
-
-# Profit coloring tags
-tree.tag_configure("profit_positive", foreground=PROFIT_GREEN)
-tree.tag_configure("profit_negative", foreground=PROFIT_RED)
-
-# Set column widths & anchors
-for col in columns:
-    tree.heading(col, text=col)
-    tree.column(col, width=120, anchor="w")
-tree.column("Title", width=250)
-tree.column("eBay URL", width=240)
-tree.column("PriceCharting Link", width=240)
-tree.column("Profit", width=80, anchor="center")
-
-tree.bind("<Double-1>", open_link)
-
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("PriceCharting vs eBay Auction Viewer")
+
+    # Dark mode colors
+    BG_COLOR = "#121212"
+    FG_COLOR = "white"
+    TREE_BG = "#1e1e1e"
+    TREE_ALT_BG = "#2c2c2c"
+    TREE_FG = "white"
+    PROFIT_GREEN = "#00ff00"
+    PROFIT_RED = "#ff5555"
+
+    root.configure(bg=BG_COLOR)
+
+    frame = tk.Frame(root, bg=BG_COLOR)
+    frame.pack(padx=10, pady=10)
+
+    entry = tk.Entry(frame, width=60, bg="#222222", fg=FG_COLOR, insertbackground=FG_COLOR, relief="flat")
+    entry.grid(row=0, column=0, padx=5)
+
+    buying_option_var = tk.StringVar(value="Auction")
+    buying_option_combo = ttk.Combobox(frame, textvariable=buying_option_var, values=["Auction", "Buy Now"], state="readonly", width=10)
+    buying_option_combo.grid(row=0, column=1, padx=5)
+
+    search_button = tk.Button(frame, text="Search", command=search_and_display, bg="#333333", fg=FG_COLOR, relief="flat", activebackground="#444444")
+    search_button.grid(row=0, column=2, padx=5)
+
+    load_button = tk.Button(frame, text="Load URLs...", command=load_item_urls, bg="#333333", fg=FG_COLOR, relief="flat", activebackground="#444444")
+    load_button.grid(row=0, column=3, padx=5)
+
+    # Narrows the table to titles containing every typed word
+    filter_label = tk.Label(frame, text="Filter", bg=BG_COLOR, fg=FG_COLOR)
+    filter_label.grid(row=0, column=4, padx=(15, 5))
+    filter_var = tk.StringVar()
+    filter_entry = tk.Entry(frame, textvariable=filter_var, width=20, bg="#222222", fg=FG_COLOR, insertbackground=FG_COLOR, relief="flat")
+    filter_entry.grid(row=0, column=5, padx=5)
+    filter_entry.bind("<KeyRelease>", apply_filter)
+
+    columns = ("Title", "Bid", "Shipping", "Total", "Time Left", "eBay URL", "PriceCharting Price", "PriceCharting Link", "Profit", "ROI")
+    # Only the rows on screen exist as Treeview items; sorting and filtering run off the Tk thread
+    SORT_COLUMNS = {"Bid": "bid", "Shipping": "shipping", "Total": "total", "Time Left": "end_time",
+                    "PriceCharting Price": "market_price", "Profit": "profit", "ROI": "roi"}
+    table = ListingTable()
+    results_view = VirtualTable(root, columns, row_cells, table.view, SORT_COLUMNS,
+                                ascending_columns=("end_time",), on_rows=update_status, bg=BG_COLOR)
+    results_view.pack(padx=10, pady=10, fill="both", expand=True)
+    tree = results_view.tree
+
+    style = ttk.Style()
+    style.theme_use('default')
+
+    style.configure("Treeview",
+                    background=TREE_BG,
+                    foreground=TREE_FG,
+                    fieldbackground=TREE_BG,
+                    highlightthickness=0,
+                    bd=0,
+                    font=('Arial', 10))
+
+    style.map('Treeview', background=[('selected', '#555555')], foreground=[('selected', 'white')])
+
+    style.configure("Treeview.Heading",
+                    background="#333333",
+                    foreground=FG_COLOR,
+                    relief="flat")
+
+    # Profit coloring tags
+    tree.tag_configure("profit_positive", foreground=PROFIT_GREEN)
+    tree.tag_configure("profit_negative", foreground=PROFIT_RED)
+
+    # Set column widths & anchors
+    for col in columns:
+        tree.column(col, width=120, anchor="w")
+    tree.column("Title", width=250)
+    tree.column("eBay URL", width=240)
+    tree.column("PriceCharting Link", width=240)
+    tree.column("Profit", width=80, anchor="center")
+    tree.column("ROI", width=70, anchor="center")
+
+    tree.bind("<Double-1>", open_link)
+
+    status_var = tk.StringVar()
+    status_label = tk.Label(root, textvariable=status_var, bg=BG_COLOR, fg=FG_COLOR, anchor="w")
+    status_label.pack(padx=10, pady=(0, 2), fill="x")
+
+    # Per-stage p95 latencies, cache hits, retries and timeouts of the current search
+    metrics_var = tk.StringVar()
+    metrics_label = tk.Label(root, textvariable=metrics_var, bg=BG_COLOR, fg="#aaaaaa", anchor="w")
+    metrics_label.pack(padx=10, pady=(0, 10), fill="x")
+
+    engine = create_engine()
+    background_search = BackgroundSearch(root, engine, show_listings, show_results, search_finished, search_failed)
+
+    root.mainloop()